@@ -0,0 +1,259 @@
+# common/log.py
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+ROOT_LOGGER = "wolfstep"
+DEFAULT_LEVEL = logging.INFO
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Warnings and errors get this many times the DEBUG/INFO budget: they are rare
+# unless something is wrong, and then the first occurrences matter most.
+WARNING_BUDGET = 10
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def get_logger(category: str) -> 'CategoryLogger':
+    """
+    Logger for a category, e.g. ``get_logger("gps")`` -> ``wolfstep.gps``.
+
+    Pass values as arguments (``log.debug("fix lat=%.6f", lat)``), never as an
+    f-string: the message is only formatted if the call passes the level
+    check and the rate limit, and then on the listener thread.
+    """
+    return CategoryLogger(logging.getLogger(f"{ROOT_LOGGER}.{category}"), {})
+
+
+def parse_levels(spec: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Parse a level spec such as ``"info,gps=warning,map=debug"``.
+
+    Returns:
+        Tuple[int, Dict[str, int]]: Default level and per-category levels.
+
+    Raises:
+        ValueError: If a level name is unknown.
+    """
+    default, levels = DEFAULT_LEVEL, {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        category, _, name = part.rpartition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name!r}")
+        if category:
+            levels[category.strip()] = level
+        else:
+            default = level
+    return default, levels
+
+
+class RateLimiter:
+    """
+    Token bucket per (logger, message template).
+
+    Each distinct call site may emit ``burst`` records at once and ``rate``
+    records per second after that. Keying on the unformatted template means a
+    GPS fix logged every frame shares one bucket, whatever its coordinates.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 5):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, name: str, msg: str) -> Optional[int]:
+        """
+        Take a token for a call site.
+
+        Returns:
+            Optional[int]: None if the record must be dropped, otherwise the
+            number of records suppressed since the last one allowed.
+        """
+        key = (name, msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]  # tokens, last refill, suppressed
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return None
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        return suppressed
+
+
+_limiter = RateLimiter()
+_warning_limiter = RateLimiter(WARNING_BUDGET, 5 * WARNING_BUDGET)
+
+
+class CategoryLogger(logging.LoggerAdapter):
+    """
+    Logger that applies the rate limit before a ``LogRecord`` is created.
+
+    A standard ``logging.Filter`` only runs once the record exists, and building
+    it costs more than the ``print`` it replaces. Checking the level and then
+    the token bucket first makes a dropped call nearly free. WARNING and above
+    draw from a separate bucket ``WARNING_BUDGET`` times larger, so a chatty
+    debug call site never starves an error.
+    """
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        limiter = _warning_limiter if level >= logging.WARNING else _limiter
+        suppressed = limiter.allow(self.logger.name, msg)
+        if suppressed is None:
+            return
+        if suppressed:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "suppressed": suppressed}
+        kwargs.setdefault("stacklevel", 2)  # Report the caller, not this adapter
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    ``QueueHandler`` that leaves formatting to the listener thread.
+
+    The stock handler formats the message in the calling thread (the Kivy UI
+    thread for most frontend logs). This one enqueues the record as is, so
+    arguments must not be mutated after the call, which holds for the numbers
+    and strings logged here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line} ({suppressed} similar suppressed)" if suppressed else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, category, msg (and suppressed)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "category": record.name[len(ROOT_LOGGER) + 1:] or ROOT_LOGGER,
+            "msg": record.getMessage()
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(
+    levels: Optional[str] = None,
+    handler: Optional[logging.Handler] = None,
+    json_format: Optional[bool] = None,
+    rate: float = 1.0,
+    burst: int = 5
+) -> QueueListener:
+    """
+    Route every ``wolfstep.*`` logger through a rate-limited queue.
+
+    Calling code only pays for the level check and, when enabled, the
+    rate-limit check and an enqueue. Formatting and I/O happen on the
+    ``QueueListener`` thread. Calling this again replaces the previous setup.
+
+    Args:
+        levels (Optional[str]): Level spec (see ``parse_levels``); defaults to
+            ``$WOLFSTEP_LOG`` or ``info``.
+        handler (Optional[logging.Handler]): Final destination (stderr by default).
+        json_format (Optional[bool]): JSON lines instead of text; defaults to
+            ``$WOLFSTEP_LOG_FORMAT == "json"``.
+        rate (float): DEBUG/INFO records per second allowed per call site
+            (``WARNING_BUDGET`` times more for warnings and errors).
+        burst (int): Records a call site may emit at once (same scaling).
+
+    Returns:
+        QueueListener: The running listener (stopped by ``shutdown_logging``).
+    """
+    global _limiter, _warning_limiter, _listener
+    default, category_levels = parse_levels(levels if levels is not None else os.getenv("WOLFSTEP_LOG", "info"))
+    if json_format is None:
+        json_format = os.getenv("WOLFSTEP_LOG_FORMAT", "").lower() == "json"
+    handler = handler or logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else TextFormatter())
+
+    with _configure_lock:
+        shutdown_logging()
+        _limiter = RateLimiter(rate, burst)
+        _warning_limiter = RateLimiter(rate * WARNING_BUDGET, burst * WARNING_BUDGET)
+        records = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [LazyQueueHandler(records)]
+        root.setLevel(default)
+        root.propagate = False
+        for category, level in category_levels.items():
+            logging.getLogger(f"{ROOT_LOGGER}.{category}").setLevel(level)
+
+        _listener = QueueListener(records, handler)
+        _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+# Example usage: python -m common.log (per-fix logging cost on the calling thread)
+if __name__ == "__main__":
+    fixes = 20_000
+    lat, lon = 40.730610, -73.935242
+
+    def per_call_us(callback) -> float:
+        start = time.perf_counter()
+        for i in range(fixes):
+            callback(i)
+        return (time.perf_counter() - start) / fixes * 1e6
+
+    with open(os.devnull, "w") as devnull:
+        # Baseline: what map_view did on every fix (stdout flushed like logcat)
+        baseline = per_call_us(lambda i: print(f"GPS Update - Lat: {lat + i}, Lon: {lon}", file=devnull, flush=True))
+        configure_logging("info,gps=debug", handler=logging.StreamHandler(devnull))
+        gps, map_log = get_logger("gps"), get_logger("map")
+        disabled = per_call_us(lambda i: map_log.debug("GPS update lat=%.6f lon=%.6f", lat + i, lon))
+        limited = per_call_us(lambda i: gps.debug("GPS update lat=%.6f lon=%.6f", lat + i, lon))
+        configure_logging("debug", handler=logging.StreamHandler(devnull), burst=fixes)
+        queued = per_call_us(lambda i: gps.debug("GPS update lat=%.6f lon=%.6f", lat + i, lon))
+        shutdown_logging()
+
+    print(f"print() per fix:                    {baseline:6.2f} us")
+    print(f"logger, level disabled:             {disabled:6.2f} us")
+    print(f"logger, enabled but rate-limited:   {limited:6.2f} us")
+    # Unthrottled: wall time includes the listener thread formatting every record under the GIL
+    print(f"logger, enabled, no rate limit:     {queued:6.2f} us (no I/O on the calling thread)")
@@ -0,0 +1,205 @@
+# frontend/geo/geofence.py
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+
+from common.log import get_logger
+from mongodb.schemas.Post import Post
+
+log = get_logger("geofence")
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+class GeofenceIndex:
+    """
+    Uniform grid over the posts prefetched around ``center``.
+
+    Positions are projected onto a local equirectangular plane around the
+    center, which is accurate to well under a meter over a few kilometers.
+    Cells are as wide as the largest query radius, so a radius query only
+    inspects the 3x3 cells around the point. That is O(1) per fix, whatever the
+    number of posts loaded.
+    """
+
+    def __init__(self, posts: List[Post], center: Tuple[float, float], radius_m: float, cell_size_m: float):
+        """
+        Args:
+            posts (List[Post]): Posts to index (only ``geolocation`` is read).
+            center (Tuple[float, float]): (lon, lat) the posts were fetched around.
+            radius_m (float): Radius the posts were fetched within.
+            cell_size_m (float): Grid cell size; must be >= any query radius.
+        """
+        self.center = center
+        self.radius_m = radius_m
+        self.cell_size_m = cell_size_m
+        self._cos_lat = math.cos(math.radians(center[1]))
+        self.posts: Dict[str, Post] = {}
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        for post in posts:
+            lon, lat = post.geolocation["coordinates"]
+            self.posts[post.uid] = post
+            self._points[post.uid] = (lon, lat)
+            self._cells.setdefault(self._cell(lon, lat), []).append(post.uid)
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def _cell(self, lon: float, lat: float) -> Tuple[int, int]:
+        dlon = (lon - self.center[0] + 180.0) % 360.0 - 180.0  # Wrap across the antimeridian
+        x = math.radians(dlon) * self._cos_lat * EARTH_RADIUS_M
+        y = math.radians(lat - self.center[1]) * EARTH_RADIUS_M
+        return math.floor(x / self.cell_size_m), math.floor(y / self.cell_size_m)
+
+    def within(self, lon: float, lat: float, radius_m: float) -> Dict[str, float]:
+        """Uids of posts within ``radius_m`` of (lon, lat), with their distances."""
+        cx, cy = self._cell(lon, lat)
+        found = {}
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for uid in self._cells.get((cx + dx, cy + dy), ()):
+                    distance = haversine_m(lon, lat, *self._points[uid])
+                    if distance <= radius_m:
+                        found[uid] = distance
+        return found
+
+    def distance_to(self, uid: str, lon: float, lat: float) -> float:
+        return haversine_m(lon, lat, *self._points[uid])
+
+    def covers(self, lon: float, lat: float, margin_m: float) -> bool:
+        """True while a circle of ``margin_m`` around (lon, lat) stays inside the prefetched area."""
+        return haversine_m(lon, lat, *self.center) + margin_m <= self.radius_m
+
+
+def http_post_fetcher(url: str, timeout: float = 10.0) -> Callable[[float, float, float], List[Post]]:
+    """
+    Build a fetcher that GETs the pins around a point from the backend.
+
+    The endpoint receives ``lon``, ``lat`` and ``radius_m`` query parameters
+    and is expected to reply with ``{"posts": [stored document, ...]}``
+    projected to ``Post.PIN_FIELDS``, e.g. from ``PostRepository.near``.
+
+    Args:
+        url (str): Pins endpoint URL.
+        timeout (float): Request timeout in seconds.
+    """
+    import requests
+
+    def fetch(lon: float, lat: float, radius_m: float) -> List[Post]:
+        response = requests.get(url, params={"lon": lon, "lat": lat, "radius_m": radius_m}, timeout=timeout)
+        response.raise_for_status()
+        return [Post.from_mongo_dict(doc) for doc in response.json()["posts"]]
+
+    return fetch
+
+
+class GeofenceTracker(EventDispatcher):
+    """
+    Turns GPS fixes into ``on_post_enter`` / ``on_post_exit`` events.
+
+    Posts around the user are prefetched into a :class:`GeofenceIndex`, and
+    every fix is checked locally, with no request per fix. A post is entered
+    within ``radius_m`` and only exited beyond ``radius_m + hysteresis_m``, so
+    GPS jitter at the edge does not flap. When the user gets within
+    ``refresh_margin_m`` of the prefetched area's edge, a new area centered on
+    the user is fetched on a worker thread and swapped in on the next frame.
+    """
+
+    __events__ = ("on_post_enter", "on_post_exit")
+
+    def __init__(
+        self,
+        fetch_posts: Callable[[float, float, float], List[Post]],
+        radius_m: float = 400.0,
+        prefetch_radius_m: float = 2000.0,
+        hysteresis_m: float = 30.0,
+        refresh_margin_m: float = 500.0,
+        retry_delay: float = 30.0,
+        **kwargs
+    ):
+        """
+        Args:
+            fetch_posts (Callable): ``(lon, lat, radius_m) -> List[Post]``, called off the main thread.
+            radius_m (float): Distance at which a post is entered.
+            prefetch_radius_m (float): Radius of the area loaded around the user.
+            hysteresis_m (float): Extra distance before a post counts as exited.
+            refresh_margin_m (float): Distance from the area's edge that triggers a refresh.
+            retry_delay (float): Seconds before retrying a failed fetch.
+        """
+        super().__init__(**kwargs)
+        self.fetch_posts = fetch_posts
+        self.radius_m = radius_m
+        self.exit_radius_m = radius_m + hysteresis_m
+        self.prefetch_radius_m = prefetch_radius_m
+        self.refresh_margin_m = refresh_margin_m
+        self.retry_delay = retry_delay
+        self.index: Optional[GeofenceIndex] = None
+        self.inside: Set[str] = set()
+        self.position: Optional[Tuple[float, float]] = None
+        self._refreshing = False
+        self._retry_at = 0.0
+
+    def update_position(self, lon: float, lat: float) -> None:
+        """Process a GPS fix: dispatch enter/exit events and refresh the area if needed."""
+        self.position = (lon, lat)
+        if self.index is not None:
+            self._check(lon, lat)
+        if self.index is None or not self.index.covers(lon, lat, self.exit_radius_m + self.refresh_margin_m):
+            self._refresh(lon, lat)
+
+    def _check(self, lon: float, lat: float) -> None:
+        nearby = self.index.within(lon, lat, self.exit_radius_m)
+        entered = [uid for uid, distance in nearby.items() if distance <= self.radius_m and uid not in self.inside]
+        exited = [uid for uid in self.inside if uid not in nearby]
+        for uid in exited:
+            self.inside.discard(uid)
+            self.dispatch("on_post_exit", uid)
+        for uid in sorted(entered, key=nearby.get):
+            self.inside.add(uid)
+            self.dispatch("on_post_enter", self.index.posts[uid])
+
+    def _refresh(self, lon: float, lat: float) -> None:
+        if self._refreshing or time.monotonic() < self._retry_at:
+            return
+        self._refreshing = True
+        threading.Thread(target=self._fetch, args=(lon, lat), daemon=True).start()
+
+    def _fetch(self, lon: float, lat: float) -> None:
+        try:
+            posts = self.fetch_posts(lon, lat, self.prefetch_radius_m)
+        except Exception as e:
+            log.warning("Geofence prefetch failed (%s), retrying in %.0fs", e, self.retry_delay)
+            self._retry_at = time.monotonic() + self.retry_delay
+            self._refreshing = False
+            return
+        index = GeofenceIndex(posts, (lon, lat), self.prefetch_radius_m, self.exit_radius_m)
+        Clock.schedule_once(lambda dt: self._swap(index), 0)
+
+    def _swap(self, index: GeofenceIndex) -> None:
+        """Install a freshly fetched index (main thread) and re-check the latest fix against it."""
+        self.index = index
+        self._refreshing = False
+        # Posts missing from the new area are beyond the exit radius by construction
+        for uid in [uid for uid in self.inside if uid not in index.posts]:
+            self.inside.discard(uid)
+            self.dispatch("on_post_exit", uid)
+        if self.position is not None:
+            self._check(*self.position)
+
+    def on_post_enter(self, post: Post) -> None:
+        pass
+
+    def on_post_exit(self, post_uid: str) -> None:
+        pass
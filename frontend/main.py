@@ -5,25 +5,53 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from kivy.app import App
 from kivy.uix.floatlayout import FloatLayout
+from common.log import configure_logging, shutdown_logging
+from frontend.geo.geofence import GeofenceTracker, http_post_fetcher
 from frontend.map_view import WolfStepMapView
+from frontend.markers.user_marker import RADAR_RADIUS_M
 from frontend.menus.profile_menu import ProfileMenu
 from frontend.menus.position_menu import PositionMenu
 from frontend.menus.step_menu import StepMenu
+from frontend.sync.outbox import Outbox, OutboxSync, http_sender
+from frontend.utils.clock_profiler import ClockProfiler, FrameBudgetOverlay
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
 class WolfStepApp(App):
     def build(self):
+        # Queued, rate-limited logging; levels per category via WOLFSTEP_LOG, e.g. "info,gps=debug"
+        configure_logging()
         root = FloatLayout()
 
+        # Opt-in Clock profiling: set WOLFSTEP_PROFILE=1 (must wrap Clock before widgets schedule)
+        self.profiler = None
+        if os.getenv("WOLFSTEP_PROFILE"):
+            self.profiler = ClockProfiler()
+            self.profiler.install()
+
+        # Local write queue so posts, likes and views survive dead zones
+        self.outbox = Outbox(os.path.join(self.user_data_dir, "outbox.sqlite3"))
+        self.outbox_sync = None
+        sync_url = os.getenv("WOLFSTEP_SYNC_URL")
+        if sync_url:
+            self.outbox_sync = OutboxSync(self.outbox, send_batch=http_sender(sync_url))
+            self.outbox_sync.start()
+
+        # Geofencing against posts prefetched around the user; entering a post counts as a visit
+        self.geofence = None
+        posts_url = os.getenv("WOLFSTEP_POSTS_URL")
+        if posts_url:
+            self.geofence = GeofenceTracker(http_post_fetcher(posts_url), radius_m=RADAR_RADIUS_M)
+            self.geofence.bind(on_post_enter=lambda tracker, post: self.outbox.record_visit(post.uid))
+
         # Create menus first
         profile_menu = ProfileMenu(pos_hint={'top': 1, 'left': 0}, size_hint=(0.2, 0.2))
         position_menu = PositionMenu(pos_hint={'top': 1, 'right': 1}, size_hint=(0.2, 0.2))
         step_menu = StepMenu(pos_hint={'center_x': 0.5, 'bottom': 0}, size_hint=(0.2, 0.2))
 
         # Add MapView with position_menu reference
-        self.map_view = WolfStepMapView(position_menu=position_menu)
+        self.map_view = WolfStepMapView(position_menu=position_menu, geofence=self.geofence)
         root.add_widget(self.map_view)
 
         # Add menus to layout
@@ -31,7 +59,19 @@ class WolfStepApp(App):
         root.add_widget(position_menu)
         root.add_widget(step_menu)
 
+        if self.profiler:
+            self.profiler.profile_method(self.map_view.user_marker, "draw_radar_effect")
+            root.add_widget(FrameBudgetOverlay(self.profiler))
+
         return root
 
+    def on_stop(self):
+        if self.profiler:
+            self.profiler.dump_trace(os.path.join(self.user_data_dir, "clock_trace.json"))
+        if self.outbox_sync:
+            self.outbox_sync.stop()
+        self.outbox.close()
+        shutdown_logging()
+
 if __name__ == "__main__":
     WolfStepApp().run()
\ No newline at end of file
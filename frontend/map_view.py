@@ -1,11 +1,15 @@
 # frontend/map_view.py
-from kivy_garden.mapview import MapView, MapSource
+from kivy_garden.mapview import MapView, MapSource, MapMarker
 from kivy.utils import platform
 from kivy.clock import Clock
 from frontend.markers.user_marker import UserMarker
+from common.log import get_logger
+
+log = get_logger("map")
+gps_log = get_logger("gps")
 
 class WolfStepMapView(MapView):
-    def __init__(self, position_menu=None, **kwargs):
+    def __init__(self, position_menu=None, geofence=None, **kwargs):
         dark_map_source = MapSource(
             url="https://cartodb-basemaps-{s}.global.ssl.fastly.net/dark_all/{z}/{x}/{y}.png",
             cache_key="osm-dark",
@@ -21,13 +25,19 @@ class WolfStepMapView(MapView):
         self.position_menu = position_menu
         self.gps_initialized = False
 
+        # Posts inside the radar, discovered by the geofence tracker
+        self.geofence = geofence
+        self.discovered_markers = {}
+        if self.geofence:
+            self.geofence.bind(on_post_enter=self.on_post_enter, on_post_exit=self.on_post_exit)
+
         # Initialize user marker
         self.user_marker = UserMarker(map_view=self, lat=self.lat, lon=self.lon)
         self.add_widget(self.user_marker)
 
         # Schedule GPS initialization
         Clock.schedule_once(self.initialize_gps, 0)
-        print("MapView initialized with default position - Lat: 40.730610, Lon: -73.935242")
+        log.info("MapView initialized with default position lat=%.6f lon=%.6f", self.lat, self.lon)
 
     def initialize_gps(self, dt):
         """Initialize GPS and attempt to set initial position."""
@@ -35,47 +45,67 @@ class WolfStepMapView(MapView):
             try:
                 from frontend.utils.macos_gps import MacOSGPS
                 self.macos_gps = MacOSGPS(on_location=self.on_location)
-                print("MacOS GPS initialization scheduled")
+                gps_log.info("MacOS GPS initialization scheduled")
                 self.gps_initialized = True
             except ImportError as e:
-                print(f"MacOS GPS ImportError: {e}, switching to simulation")
+                gps_log.warning("MacOS GPS unavailable (%s), switching to simulation", e)
                 Clock.schedule_interval(self.simulate_position, 2.0)
         elif platform in ["android", "ios"]:
             try:
                 from plyer import gps
                 gps.configure(on_location=self.on_location, on_status=self.on_status)
                 gps.start(minTime=1000, minDistance=1)
-                print("Mobile GPS initialized")
+                gps_log.info("Mobile GPS initialized")
                 self.gps_initialized = True
             except Exception as e:
-                print(f"Mobile GPS error: {e}, switching to simulation")
+                gps_log.warning("Mobile GPS error (%s), switching to simulation", e)
                 Clock.schedule_interval(self.simulate_position, 2.0)
         else:
-            print("Platform not supported for GPS, using simulation")
+            gps_log.info("Platform not supported for GPS, using simulation")
             Clock.schedule_interval(self.simulate_position, 2.0)
 
     def on_location(self, **kwargs):
         """Handle GPS location updates."""
         self.lat = kwargs.get('lat', self.lat)
         self.lon = kwargs.get('lon', self.lon)
-        print(f"GPS Update - Lat: {self.lat}, Lon: {self.lon}")
+        gps_log.debug("GPS update lat=%.6f lon=%.6f", self.lat, self.lon)
         self.update_marker_and_center()
+        if self.geofence:
+            self.geofence.update_position(self.lon, self.lat)
         if self.position_menu:
             self.position_menu.update_position(self.lat, self.lon)
 
     def on_status(self, status):
         """Display GPS status (mobile only)."""
-        print(f"GPS Status: {status}")
+        gps_log.info("GPS status: %s", status)
 
     def simulate_position(self, dt):
         """Simulate position updates."""
         self.lat += 0.0005
         self.lon += 0.001
-        print(f"Simulation Update - Lat: {self.lat}, Lon: {self.lon}")
+        gps_log.debug("Simulated update lat=%.6f lon=%.6f", self.lat, self.lon)
         self.update_marker_and_center()
+        if self.geofence:
+            self.geofence.update_position(self.lon, self.lat)
         if self.position_menu:
             self.position_menu.update_position(self.lat, self.lon)
 
+    def on_post_enter(self, tracker, post):
+        """Show a post pin once the wolf is close enough to discover it."""
+        if post.uid in self.discovered_markers:
+            return
+        lon, lat = post.geolocation["coordinates"]
+        marker = MapMarker(lat=lat, lon=lon, source="frontend/assets/wolf_footprint.png")
+        self.discovered_markers[post.uid] = marker
+        self.add_marker(marker)
+        log.info("Post discovered: %s", post.uid)
+
+    def on_post_exit(self, tracker, post_uid):
+        """Hide the pin of a post that left the radar."""
+        marker = self.discovered_markers.pop(post_uid, None)
+        if marker is not None:
+            self.remove_marker(marker)
+
     def update_marker_and_center(self):
         """Update marker position and center map."""
         self.user_marker.update_position(self.lat, self.lon)
@@ -5,6 +5,8 @@ from kivy.clock import Clock
 from kivy.properties import NumericProperty
 from kivy.core.text import Label as CoreLabel
 
+RADAR_RADIUS_M = 400  # Radar radius, also the geofence radius for discovering posts
+
 class UserMarker(Widget):
     opacity = NumericProperty(0.5)  # Base opacity for pulsing
     radar_scale = NumericProperty(0.1)  # Starts small and grows
@@ -47,7 +49,7 @@ class UserMarker(Widget):
 
             # Calculate 400m radius in pixels
             meters_per_pixel = 156543.03392 * (2 ** (-self.map_view.zoom))
-            max_radius_pixels = 400 / meters_per_pixel  # Fixed 400m limit
+            max_radius_pixels = RADAR_RADIUS_M / meters_per_pixel  # Fixed 400m limit
 
             # Pulsing radar effect (expanding circle)
             pulse_radius = self.radar_scale * max_radius_pixels  # Scales from 10% to 100%
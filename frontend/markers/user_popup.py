@@ -4,6 +4,9 @@ from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.graphics import Color, Triangle
+from common.log import get_logger
+
+log = get_logger("ui")
 
 class UserPopup(Popup):
     def __init__(self, user_marker, **kwargs):
@@ -83,4 +86,4 @@ class UserPopup(Popup):
             window_x = pixel_x - (self.width / 2)  # Center horizontally
             window_y = pixel_y + marker_height + 38  # 1cm (38px) above wolf top
             self.pos = (window_x, window_y)
-            print(f"Popup positioned at: ({window_x}, {window_y}), Size: {self.size}")
\ No newline at end of file
+            log.debug("Popup positioned at (%.0f, %.0f), size %s", window_x, window_y, self.size)
\ No newline at end of file
@@ -3,6 +3,9 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.image import Image
 from kivy.uix.label import Label
 from kivy.uix.behaviors import ButtonBehavior
+from common.log import get_logger
+
+log = get_logger("ui")
 
 class StepMenu(ButtonBehavior, BoxLayout):
     def __init__(self, **kwargs):
@@ -16,4 +19,4 @@ class StepMenu(ButtonBehavior, BoxLayout):
         """Handle click event."""
         self.step_count += 1  # Increment step count
         self.step_label.text = f"Steps: {self.step_count}"  # Update label
-        print(f"StepMenu clicked! Steps: {self.step_count}")  # Debug output
\ No newline at end of file
+        log.debug("StepMenu clicked, steps=%d", self.step_count)
\ No newline at end of file
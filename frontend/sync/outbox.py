@@ -0,0 +1,344 @@
+# frontend/sync/outbox.py
+import gzip
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from kivy.clock import Clock
+
+from common.log import get_logger
+from mongodb.schemas.Post import Post
+
+log = get_logger("sync")
+
+
+class OutboxFullError(RuntimeError):
+    """Raised when the outbox already holds ``max_entries`` pending operations."""
+
+
+class Outbox:
+    """
+    SQLite-backed write queue for actions taken while the backend is unreachable.
+
+    New posts are stored as one row each. Likes and views are coalesced into a
+    single open counter row per post (and visits into one open visit row), so
+    tapping "like" a hundred times in a dead zone costs one row, not a
+    hundred. Once a row has been handed out in a batch it is sealed: its
+    content never changes again, which lets the server deduplicate retries on
+    the row's ``op_id``.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 5000):
+        """
+        Open (or create) the outbox database.
+
+        Args:
+            db_path (str): Path of the SQLite file.
+            max_entries (int): Maximum number of pending rows before new posts are refused.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ops (
+                op_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                post_uid TEXT NOT NULL,
+                payload TEXT,
+                like_delta INTEGER NOT NULL DEFAULT 0,
+                view_delta INTEGER NOT NULL DEFAULT 0,
+                sealed INTEGER NOT NULL DEFAULT 0,
+                queued_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ops_by_post ON ops (post_uid, kind, sealed)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ops").fetchone()[0]
+
+    def enqueue_post(self, post: Post) -> str:
+        """
+        Queue a newly created post for upload.
+
+        Args:
+            post (Post): The post, keyed by its client-generated ``uid``.
+
+        Returns:
+            str: The operation id of the queued row.
+
+        Raises:
+            OutboxFullError: If the outbox is at capacity.
+        """
+        op_id = str(uuid.uuid4())
+        with self._lock:
+            self._ensure_capacity()
+            self._conn.execute(
+                "INSERT INTO ops (op_id, kind, post_uid, payload, queued_at) VALUES (?, 'post', ?, ?, ?)",
+                (op_id, post.uid, json.dumps(post.to_mongo_dict()), time.time())
+            )
+            self._conn.commit()
+        return op_id
+
+    def record_like(self, post_uid: str, count: int = 1) -> None:
+        """Add ``count`` likes for ``post_uid`` to the open counter row."""
+        self._add_counters(post_uid, like_delta=count)
+
+    def record_view(self, post_uid: str, count: int = 1) -> None:
+        """Add ``count`` views for ``post_uid`` to the open counter row."""
+        self._add_counters(post_uid, view_delta=count)
+
+    def record_visit(self, post_uid: str) -> None:
+        """
+        Queue a visit of ``post_uid`` by this user.
+
+        Visits are deduplicated server-side (see ``mongodb.visits``), so only
+        one open row per post is kept here. This runs from the geofence
+        callbacks, so it never raises ``OutboxFullError``: a full outbox gives
+        up its oldest unsent visit instead, or drops this one if it has none.
+        """
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT 1 FROM ops WHERE post_uid = ? AND kind = 'visit' AND sealed = 0", (post_uid,)
+            ).fetchone()
+            if pending is None:
+                if not self._has_capacity() and not self._evict_oldest_visit():
+                    log.warning("Outbox full, dropping visit of %s", post_uid)
+                    return
+                self._conn.execute(
+                    "INSERT INTO ops (op_id, kind, post_uid, queued_at) VALUES (?, 'visit', ?, ?)",
+                    (str(uuid.uuid4()), post_uid, time.time())
+                )
+                self._conn.commit()
+
+    def _add_counters(self, post_uid: str, like_delta: int = 0, view_delta: int = 0) -> None:
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE ops SET like_delta = like_delta + ?, view_delta = view_delta + ?
+                WHERE post_uid = ? AND kind = 'counters' AND sealed = 0
+                """,
+                (like_delta, view_delta, post_uid)
+            )
+            if cursor.rowcount == 0:
+                self._ensure_capacity()
+                self._conn.execute(
+                    """
+                    INSERT INTO ops (op_id, kind, post_uid, like_delta, view_delta, queued_at)
+                    VALUES (?, 'counters', ?, ?, ?, ?)
+                    """,
+                    (str(uuid.uuid4()), post_uid, like_delta, view_delta, time.time())
+                )
+            self._conn.commit()
+
+    def _has_capacity(self) -> bool:
+        return self._conn.execute("SELECT COUNT(*) FROM ops").fetchone()[0] < self.max_entries
+
+    def _ensure_capacity(self) -> None:
+        if not self._has_capacity():
+            raise OutboxFullError(f"Outbox is full ({self.max_entries} pending operations)")
+
+    def _evict_oldest_visit(self) -> bool:
+        """Delete the oldest unsealed visit row; False if there is none."""
+        cursor = self._conn.execute(
+            """
+            DELETE FROM ops WHERE op_id = (
+                SELECT op_id FROM ops WHERE kind = 'visit' AND sealed = 0 ORDER BY queued_at LIMIT 1
+            )
+            """
+        )
+        return cursor.rowcount > 0
+
+    def take_batch(self, limit: int = 200) -> List[Dict]:
+        """
+        Seal and return the oldest pending operations, posts before counters and visits.
+
+        Rows stay in the outbox until acknowledged, so a failed upload simply
+        hands out the same sealed rows again on the next attempt.
+
+        Args:
+            limit (int): Maximum number of operations in the batch.
+
+        Returns:
+            List[Dict]: Operations ready to be sent.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT op_id, kind, post_uid, payload, like_delta, view_delta FROM ops
+                ORDER BY CASE kind WHEN 'post' THEN 0 ELSE 1 END, queued_at
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+            self._conn.executemany("UPDATE ops SET sealed = 1 WHERE op_id = ?", [(row[0],) for row in rows])
+            self._conn.commit()
+
+        batch = []
+        for op_id, kind, post_uid, payload, like_delta, view_delta in rows:
+            op = {"op_id": op_id, "kind": kind, "post_uid": post_uid}
+            if kind == "post":
+                op["post"] = json.loads(payload)
+            elif kind == "counters":
+                op["like_delta"] = like_delta
+                op["view_delta"] = view_delta
+            batch.append(op)
+        return batch
+
+    def acknowledge(self, op_ids: List[str]) -> None:
+        """Remove operations the server has confirmed or rejected."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM ops WHERE op_id = ?", [(op_id,) for op_id in op_ids])
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def encode_batch(batch: List[Dict]) -> bytes:
+    """Serialize a batch as gzip-compressed JSON."""
+    return gzip.compress(json.dumps({"ops": batch}, separators=(",", ":")).encode("utf-8"))
+
+
+def http_sender(url: str, timeout: float = 10.0) -> Callable[[List[Dict]], Dict[str, List[str]]]:
+    """
+    Build a sender that POSTs compressed batches to the sync endpoint.
+
+    The endpoint is expected to reply with ``{"acked": [op_id, ...], "rejected": [op_id, ...]}``
+    (see ``mongodb.sync.apply_sync_batch``).
+
+    Args:
+        url (str): Sync endpoint URL.
+        timeout (float): Request timeout in seconds.
+    """
+    import requests
+
+    def send(batch: List[Dict]) -> Dict[str, List[str]]:
+        response = requests.post(
+            url,
+            data=encode_batch(batch),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        reply = response.json()
+        return {"acked": reply["acked"], "rejected": reply.get("rejected", [])}
+
+    return send
+
+
+class OutboxSync:
+    """
+    Drains an :class:`Outbox` in batches with exponential backoff.
+
+    Uploads run on a worker thread so the Kivy main loop never blocks on the
+    network; scheduling goes through ``Clock`` like the rest of the frontend.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        send_batch: Callable[[List[Dict]], Dict[str, List[str]]],
+        interval: float = 30.0,
+        batch_size: int = 200,
+        max_backoff: float = 600.0
+    ):
+        """
+        Args:
+            outbox (Outbox): Queue to drain.
+            send_batch (Callable): Uploads a batch and returns the ``acked`` and
+                ``rejected`` op ids; both are removed from the outbox.
+            interval (float): Seconds between sync attempts while healthy.
+            batch_size (int): Maximum operations per upload.
+            max_backoff (float): Upper bound for the retry delay in seconds.
+        """
+        self.outbox = outbox
+        self.send_batch = send_batch
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self._event = None
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start periodic syncing."""
+        self._running = True
+        self._schedule(0)
+
+    def stop(self) -> None:
+        """Stop syncing; an upload already in flight is allowed to finish."""
+        self._running = False
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def sync_now(self) -> None:
+        """Trigger an immediate attempt, e.g. when connectivity comes back."""
+        self.failures = 0
+        self._schedule(0)
+
+    def _schedule(self, delay: float) -> None:
+        if not self._running:
+            return
+        if self._event is not None:
+            self._event.cancel()
+        self._event = Clock.schedule_once(self._tick, delay)
+
+    def _tick(self, dt) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._worker.start()
+
+    def _drain(self) -> None:
+        """Upload batches until the outbox is empty or an upload fails."""
+        try:
+            while True:
+                batch = self.outbox.take_batch(self.batch_size)
+                if not batch:
+                    break
+                reply = self.send_batch(batch)
+                done = reply["acked"] + reply["rejected"]
+                if reply["rejected"]:
+                    # Will never apply (e.g. a like on a deleted post): drop rather than block the queue
+                    log.warning("Server rejected %d operations, dropping them", len(reply["rejected"]))
+                self.outbox.acknowledge(done)
+                if len(done) < len(batch):
+                    # Rows the server could not apply yet stay queued for the next attempt
+                    log.info("Server left %d of %d operations for retry", len(batch) - len(done), len(batch))
+                    break
+                if len(batch) < self.batch_size:
+                    break
+        except Exception as e:
+            self.failures += 1
+            delay = self._backoff_delay()
+            log.warning("Outbox sync failed (%s), retrying in %.0fs", e, delay)
+            Clock.schedule_once(lambda dt: self._schedule(delay), 0)
+            return
+        self.failures = 0
+        Clock.schedule_once(lambda dt: self._schedule(self.interval), 0)
+
+    def _backoff_delay(self) -> float:
+        """
+        Exponential backoff with equal jitter, capped at ``max_backoff``: a
+        random delay in the upper half of the exponential ceiling.
+        """
+        ceiling = min(self.max_backoff, self.interval * (2 ** (self.failures - 1)))
+        return random.uniform(ceiling / 2, ceiling)
@@ -0,0 +1,237 @@
+# frontend/utils/clock_profiler.py
+import functools
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from kivy.clock import Clock
+from kivy.uix.label import Label
+
+from common.log import get_logger
+
+log = get_logger("profiler")
+
+FRAME_BUDGET_MS = 1000 / 60  # 16.6 ms per frame at 60 fps
+F12_KEYCODE = 293
+
+
+class CallbackStats:
+    """Accumulated cost of one profiled callback."""
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.max_wall_ns = 0
+
+    def add(self, wall_ns: int, cpu_ns: int) -> None:
+        self.calls += 1
+        self.wall_ns += wall_ns
+        self.cpu_ns += cpu_ns
+        self.max_wall_ns = max(self.max_wall_ns, wall_ns)
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "avg_wall_ms": self.wall_ns / self.calls / 1e6 if self.calls else 0.0,
+            "max_wall_ms": self.max_wall_ns / 1e6,
+            "avg_cpu_ms": self.cpu_ns / self.calls / 1e6 if self.calls else 0.0
+        }
+
+
+class ClockProfiler:
+    """
+    Opt-in profiler for Kivy ``Clock`` callbacks and canvas rebuilds.
+
+    Once installed, every callback passed to ``Clock.schedule_interval`` or
+    ``Clock.schedule_once`` is wrapped to record its wall time and the CPU time
+    of the main thread. Frame times are sampled from a per-frame callback, and
+    every measurement is also kept as a Chrome trace event so a session can be
+    opened in ``chrome://tracing`` or Perfetto afterwards.
+    """
+
+    def __init__(self, budget_ms: float = FRAME_BUDGET_MS, max_trace_events: int = 200_000):
+        """
+        Args:
+            budget_ms (float): Frame budget shown by the overlay.
+            max_trace_events (int): Trace events kept in memory (oldest dropped first).
+        """
+        self.budget_ms = budget_ms
+        self.stats: Dict[str, CallbackStats] = {}
+        self.frames = deque(maxlen=120)  # (frame_ms, callbacks_ms) for the last ~2 s
+        self.trace_events = deque(maxlen=max_trace_events)
+        self._frame_callbacks_ns = 0
+        self._depth = 0  # Nested profiled calls only count once towards the frame total
+        self._originals: Dict[str, Callable] = {}
+        self._origin_ns = time.perf_counter_ns()
+        self._frame_event = None
+
+    def install(self) -> None:
+        """Start wrapping newly scheduled callbacks and sampling frames."""
+        if self._originals:
+            return
+        for name in ("schedule_once", "schedule_interval", "unschedule"):
+            self._originals[name] = getattr(Clock, name)
+
+        def schedule_once(callback, timeout=0):
+            return self._originals["schedule_once"](self.wrap(callback), timeout)
+
+        def schedule_interval(callback, timeout):
+            return self._originals["schedule_interval"](self.wrap(callback), timeout)
+
+        def unschedule(callback, all=True):
+            # Scheduled events hold the wrappers, so match on the wrapped callback too
+            for event in Clock.get_events():
+                if getattr(event.get_callback(), "__wrapped__", None) == callback:
+                    event.cancel()
+                    if not all:
+                        return
+            return self._originals["unschedule"](callback, all)
+
+        Clock.schedule_once = schedule_once
+        Clock.schedule_interval = schedule_interval
+        Clock.unschedule = unschedule
+        self._frame_event = self._originals["schedule_interval"](self._on_frame, 0)
+        log.info("Clock profiler installed")
+
+    def uninstall(self) -> None:
+        """Restore the original ``Clock`` methods. Already wrapped callbacks keep reporting."""
+        if self._frame_event is not None:
+            self._frame_event.cancel()
+            self._frame_event = None
+        for name, original in self._originals.items():
+            setattr(Clock, name, original)
+        self._originals.clear()
+
+    def wrap(self, callback: Callable, label: Optional[str] = None) -> Callable:
+        """
+        Return a timed wrapper around ``callback``.
+
+        Args:
+            callback (Callable): Function or bound method to profile.
+            label (Optional[str]): Name in reports (defaults to the qualified name).
+        """
+        label = label or getattr(callback, "__qualname__", repr(callback))
+
+        @functools.wraps(callback)
+        def profiled(*args, **kwargs):
+            cpu_start = time.thread_time_ns()
+            wall_start = time.perf_counter_ns()
+            self._depth += 1
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                wall = time.perf_counter_ns() - wall_start
+                self._record(label, wall_start, wall, time.thread_time_ns() - cpu_start)
+
+        return profiled
+
+    def profile_method(self, obj, name: str, label: Optional[str] = None) -> None:
+        """
+        Profile a method on one instance, e.g. a canvas rebuild such as
+        ``UserMarker.draw_radar_effect`` that is called from several callbacks.
+        """
+        method = getattr(obj, name)
+        setattr(obj, name, self.wrap(method, label or f"canvas:{type(obj).__name__}.{name}"))
+
+    def _record(self, label: str, start_ns: int, wall_ns: int, cpu_ns: int) -> None:
+        stats = self.stats.get(label)
+        if stats is None:
+            stats = self.stats[label] = CallbackStats()
+        stats.add(wall_ns, cpu_ns)
+        if self._depth == 0:
+            self._frame_callbacks_ns += wall_ns
+        self.trace_events.append({
+            "name": label, "ph": "X", "pid": 1, "tid": 1,
+            "ts": (start_ns - self._origin_ns) / 1000, "dur": wall_ns / 1000,
+            "args": {"cpu_us": cpu_ns / 1000}
+        })
+
+    def _on_frame(self, dt) -> None:
+        frame_ms = dt * 1000
+        callbacks_ms = self._frame_callbacks_ns / 1e6
+        self._frame_callbacks_ns = 0
+        self.frames.append((frame_ms, callbacks_ms))
+        self.trace_events.append({
+            "name": "frame", "ph": "C", "pid": 1,
+            "ts": (time.perf_counter_ns() - self._origin_ns) / 1000,
+            "args": {"frame_ms": frame_ms, "callbacks_ms": callbacks_ms}
+        })
+
+    def summary(self) -> Dict:
+        """Per-callback statistics and recent frame times."""
+        frame_times = [frame for frame, _ in self.frames]
+        return {
+            "budget_ms": self.budget_ms,
+            "avg_frame_ms": sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            "max_frame_ms": max(frame_times, default=0.0),
+            "callbacks": {label: stats.to_dict() for label, stats in self.stats.items()}
+        }
+
+    def dump_trace(self, path: str) -> str:
+        """
+        Write the session as a Chrome trace file with the summary in its metadata.
+
+        Args:
+            path (str): Output file path.
+
+        Returns:
+            str: The path written.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": list(self.trace_events), "metadata": self.summary()}, file)
+        log.info("Clock profiler trace written to %s", path)
+        return path
+
+
+class FrameBudgetOverlay(Label):
+    """
+    On-screen frame time vs budget and the most expensive callbacks. Toggle with F12.
+    """
+
+    def __init__(self, profiler: ClockProfiler, refresh_interval: float = 0.5, top_n: int = 5, **kwargs):
+        kwargs.setdefault("size_hint", (0.45, 0.25))
+        kwargs.setdefault("pos_hint", {"x": 0, "y": 0})
+        kwargs.setdefault("halign", "left")
+        kwargs.setdefault("valign", "bottom")
+        kwargs.setdefault("font_size", "12sp")
+        super().__init__(**kwargs)
+        from kivy.core.window import Window  # Imported lazily: creating the window is a side effect
+
+        self.profiler = profiler
+        self.top_n = top_n
+        self.bind(size=self.setter("text_size"))
+        Window.bind(on_key_down=self._on_key_down)
+        # Refreshing twice a second keeps the overlay itself out of the frame budget
+        self._event = Clock.schedule_interval(self.refresh, refresh_interval)
+
+    def _on_key_down(self, window, keycode, *args):
+        if keycode == F12_KEYCODE:
+            self.opacity = 0 if self.opacity else 1
+            return True
+        return False
+
+    def refresh(self, dt) -> None:
+        if not self.opacity or not self.profiler.frames:
+            return
+        frames = self.profiler.frames
+        frame_ms = sum(frame for frame, _ in frames) / len(frames)
+        callbacks_ms = sum(callbacks for _, callbacks in frames) / len(frames)
+        worst = max(frame for frame, _ in frames)
+        over = sum(1 for frame, _ in frames if frame > self.profiler.budget_ms)
+        lines = [
+            f"Frame {frame_ms:.1f} ms / {self.profiler.budget_ms:.1f} ms budget (worst {worst:.1f}, {over} over)",
+            f"Callbacks {callbacks_ms:.2f} ms/frame"
+        ]
+        ranked = sorted(self.profiler.stats.items(), key=lambda item: item[1].wall_ns, reverse=True)
+        for label, stats in ranked[:self.top_n]:
+            info = stats.to_dict()
+            lines.append(f"{label}: {info['avg_wall_ms']:.2f} ms avg, {info['max_wall_ms']:.2f} max, x{stats.calls}")
+        self.text = "\n".join(lines)
+        self.color = (1, 0.3, 0.3, 1) if frame_ms > self.profiler.budget_ms else (0.6, 1, 0.6, 1)
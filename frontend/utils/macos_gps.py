@@ -1,5 +1,8 @@
 import geocoder
 from kivy.clock import Clock
+from common.log import get_logger
+
+log = get_logger("gps")
 
 class MacOSGPS:
     def __init__(self, on_location=None):
@@ -8,70 +11,70 @@ class MacOSGPS:
         """
         self.on_location = on_location
         self.auth_status = None  # Simulate authorization status
-        print("[Init] Initializing MacOSGPS...")
+        log.info("Initializing MacOSGPS")
         Clock.schedule_once(self.check_authorization, 0)
 
     def check_authorization(self, dt):
         """
         Simulate checking authorization for location services.
         """
-        print("[Auth] Checking location authorization...")
+        log.debug("Checking location authorization")
         # Simulate authorization status (always authorized for geocoder)
         self.auth_status = 3  # AuthorizedWhenInUse
         if self.auth_status in (3, 4):  # AuthorizedWhenInUse or AuthorizedAlways
-            print("[Auth] Location access granted")
+            log.info("Location access granted")
             self.start_gps(0)
         else:
-            print("[Auth] Location access denied")
+            log.warning("Location access denied")
 
     def start_gps(self, dt):
         """
         Start fetching GPS updates using geocoder.
         """
-        print("[Start] Starting GPS updates...")
+        log.info("Starting GPS updates")
         Clock.schedule_once(self.fetch_location, 0)
 
     def fetch_location(self, dt):
         """
         Fetch the current location using geocoder and call the callback.
         """
-        print("[Fetch] Fetching location using geocoder...")
+        log.debug("Fetching location using geocoder")
         try:
             location = geocoder.ip('me').latlng
-            print(f"[Debug] Geocoder returned: {location}")
+            log.debug("Geocoder returned: %s", location)
             if location:
                 lat, lon = location
-                print(f"[Fetch] Location fetched successfully - Lat: {lat}, Lon: {lon}")
+                log.debug("Location fetched lat=%.6f lon=%.6f", lat, lon)
                 if self.on_location:
                     self.on_location(lat=lat, lon=lon)
             else:
-                print("[Fetch] Unable to fetch location. Please check your internet connection.")
+                log.warning("Unable to fetch location, check the internet connection")
         except Exception as e:
-            print(f"[Fetch] Error fetching location: {e}")
+            log.warning("Error fetching location: %s", e)
 
     def locationManagerDidChangeAuthorization_(self, manager):
         """
         Simulate handling authorization status changes (modern macOS).
         """
-        print("[Auth Change] Authorization status changed")
+        log.info("Authorization status changed")
         self.check_authorization(0)
 
     def locationManager_didChangeAuthorizationStatus_(self, manager, status):
         """
         Simulate handling authorization status changes (legacy macOS).
         """
-        print(f"[Auth Change] New Authorization Status (legacy): {status}")
+        log.info("New authorization status (legacy): %s", status)
         self.auth_status = status
         if status in (3, 4):  # AuthorizedWhenInUse or AuthorizedAlways
             self.start_gps(0)
         else:
-            print("[Auth Change] GPS disabled, auth status: {status}")
+            log.warning("GPS disabled, auth status: %s", status)
 
     def locationManager_didUpdateLocations_(self, manager, locations):
         """
         Simulate handling GPS updates.
         """
-        print("[Update] Simulating GPS updates...")
+        log.debug("Simulating GPS updates")
         self.fetch_location(0)
 
 
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from common.log import get_logger
+from mongodb.loadtest.generator import HASHTAGS, WORDS, DatasetGenerator
+from mongodb.repository import PostRepository, ProfileRepository
+from mongodb.search import PostSearch
+from mongodb.schemas.Post import Post
+
+log = get_logger("loadtest")
+
+DEFAULT_MIX = {"near_me": 45, "thread": 15, "profile": 15, "write": 15, "search": 10}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Workload:
+    """
+    Operations the load driver can replay, bound to ids that exist in the database.
+    """
+
+    def __init__(self, db, post_ids: List[str], thread_ids: List[str], profile_ids: List[str],
+                 generator: DatasetGenerator, radius_m: float = 1000.0, seed: int = 7):
+        """
+        Args:
+            db (pymongo.database.Database): Database under test.
+            post_ids (List[str]): Post uids to like/view.
+            thread_ids (List[str]): Uids of posts that have replies.
+            profile_ids (List[str]): Profile uids to read.
+            generator (DatasetGenerator): Source of realistic locations for new posts and near-me queries.
+            radius_m (float): Radius of near-me queries.
+            seed (int): Random seed for operation arguments.
+        """
+        self.posts = PostRepository(db)
+        self.profiles = ProfileRepository(db)
+        self.search_engine = PostSearch(db)
+        self.post_ids = post_ids
+        self.thread_ids = thread_ids or post_ids
+        self.profile_ids = profile_ids
+        self.generator = generator
+        self.radius_m = radius_m
+        self.rng = random.Random(seed)
+        self.operations: Dict[str, Callable[[], object]] = {
+            "near_me": self.near_me,
+            "near_me_pins": self.near_me_pins,
+            "thread": self.thread,
+            "profile": self.profile,
+            "write": self.write,
+            "search": self.search
+        }
+
+    @classmethod
+    def from_database(cls, db, generator: DatasetGenerator, sample_size: int = 5000, **kwargs) -> 'Workload':
+        """Sample existing ids with ``$sample`` instead of relying on a freshly generated dataset."""
+        reply_count = Post.FIELDS.field("reply_count")
+        posts = list(db.posts.aggregate([{"$sample": {"size": sample_size}}, {"$project": {reply_count: 1}}]))
+        profiles = db.profiles.aggregate([{"$sample": {"size": sample_size}}, {"$project": {"_id": 1}}])
+        return cls(
+            db,
+            post_ids=[doc["_id"] for doc in posts],
+            thread_ids=[doc["_id"] for doc in posts if doc.get(reply_count)],
+            profile_ids=[doc["_id"] for doc in profiles],
+            generator=generator,
+            **kwargs
+        )
+
+    def near_me(self):
+        lon, lat = self.generator.random_location()
+        return self.posts.near(lon, lat, self.radius_m)
+
+    def near_me_pins(self):
+        lon, lat = self.generator.random_location()
+        return self.posts.near(lon, lat, self.radius_m, fields=Post.PIN_FIELDS)
+
+    def thread(self):
+        return self.posts.thread(self.rng.choice(self.thread_ids))
+
+    def profile(self):
+        return self.profiles.get(self.rng.choice(self.profile_ids))
+
+    def search(self):
+        lon, lat = self.generator.random_location()
+        roll = self.rng.random()
+        if roll < 0.4:
+            query = self.rng.choice(HASHTAGS)
+        elif roll < 0.8:
+            query = self.rng.choice(WORDS)
+        else:
+            query = f"{self.rng.choice(WORDS)} {self.rng.choice(HASHTAGS)}"
+        return self.search_engine.search(query, longitude=lon, latitude=lat, radius_m=self.radius_m * 3)
+
+    def write(self):
+        roll = self.rng.random()
+        if roll < 0.2:
+            lon, lat = self.generator.random_location()
+            return self.posts.create(Post(longitude=lon, latitude=lat, title="Load test", text="#WolfStep"))
+        if roll < 0.5:
+            return self.posts.like(self.rng.choice(self.post_ids))
+        return self.posts.add_view(self.rng.choice(self.post_ids))
+
+
+class LoadDriver:
+    """
+    Open-loop asyncio load generator.
+
+    Operations are started on a fixed schedule at ``rate`` per second whatever
+    the response times, and run on a thread pool since pymongo is blocking.
+    Latency is measured from each operation's *scheduled* start so queueing
+    delay under overload shows up in the percentiles instead of being hidden
+    (coordinated omission).
+    """
+
+    def __init__(self, workload: Workload, rate: float, duration: float,
+                 mix: Optional[Dict[str, float]] = None, concurrency: int = 64, seed: int = 11):
+        """
+        Args:
+            workload (Workload): Operations to replay.
+            rate (float): Target operations per second.
+            duration (float): Test length in seconds.
+            mix (Optional[Dict[str, float]]): Relative weight per operation.
+            concurrency (int): Worker threads (max operations in flight).
+            seed (int): Random seed for the operation sequence.
+        """
+        self.workload = workload
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.mix}
+        self.errors: Dict[str, int] = {name: 0 for name in self.mix}
+        self.error_samples: Dict[str, str] = {}
+
+    async def run(self) -> Dict:
+        """
+        Run the test and return the report.
+        """
+        loop = asyncio.get_running_loop()
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        total = int(self.rate * self.duration)
+        tasks = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            start = loop.time()
+            for i in range(total):
+                scheduled = start + i / self.rate
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                name = self.rng.choices(names, weights)[0]
+                tasks.append(asyncio.ensure_future(self._execute(loop, executor, name, scheduled)))
+            await asyncio.gather(*tasks)
+            elapsed = loop.time() - start
+        return self.report(elapsed)
+
+    async def _execute(self, loop, executor, name: str, scheduled: float) -> None:
+        try:
+            await loop.run_in_executor(executor, self.workload.operations[name])
+        except Exception as e:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, f"{type(e).__name__}: {e}")
+            return
+        self.latencies[name].append((loop.time() - scheduled) * 1000)
+
+    def report(self, elapsed: float) -> Dict:
+        """
+        Throughput and p50/p95/p99 latency (ms) per operation.
+        """
+        operations = {}
+        for name, values in self.latencies.items():
+            values = sorted(values)
+            operations[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "throughput_per_s": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3) if values else 0.0
+            }
+            if name in self.error_samples:
+                operations[name]["error_sample"] = self.error_samples[name]
+        completed = sum(op["count"] for op in operations.values())
+        return {
+            "target_rate_per_s": self.rate,
+            "duration_s": round(elapsed, 3),
+            "throughput_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+            "operations": operations
+        }
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse ``near_me=50,thread=20`` into a weight mapping."""
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+# Example usage: python -m mongodb.loadtest.driver --generate --posts 50000 --rate 500 --duration 30
+if __name__ == "__main__":
+    import argparse
+    from pymongo import MongoClient
+    from common.log import configure_logging
+    from mongodb.loadtest.generator import load_dataset
+
+    parser = argparse.ArgumentParser(description="Replay a WolfStep operation mix and report latency as JSON")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--database", default="wolfstep_loadtest")
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-process mongomock database (no geo operators)")
+    parser.add_argument("--generate", action="store_true", help="Generate and load a dataset first")
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--profiles", type=int, default=5_000)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.mongomock:
+        import mongomock
+        client = mongomock.MongoClient()
+    else:
+        client = MongoClient(args.uri, maxPoolSize=args.concurrency)
+    db = client[args.database]
+    generator = DatasetGenerator()
+
+    if args.generate:
+        posts = generator.posts(args.posts)
+        profiles = generator.profiles(args.profiles)
+        load_started = time.perf_counter()
+        counts = load_dataset(db, posts, profiles)
+        load_seconds = time.perf_counter() - load_started
+        log.info("Loaded %s in %.1fs", counts, load_seconds)  # stderr: stdout carries only the JSON report
+        workload = Workload(
+            db,
+            post_ids=[post.uid for post in posts],
+            thread_ids=[post.uid for post in posts if post.reply_count],
+            profile_ids=[profile.uid for profile in profiles],
+            generator=generator
+        )
+    else:
+        workload = Workload.from_database(db, generator)
+
+    driver = LoadDriver(workload, rate=args.rate, duration=args.duration, mix=args.mix, concurrency=args.concurrency)
+    report = json.dumps(asyncio.run(driver.run()), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+    client.close()
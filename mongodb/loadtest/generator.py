@@ -0,0 +1,178 @@
+import math
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from mongodb.repository import PostRepository, ProfileRepository
+from mongodb.schemas.Post import Post
+from mongodb.schemas.Profile import Profile
+
+# (name, longitude, latitude, relative weight, spread in km)
+CITY_HOTSPOTS = [
+    ("new-york", -73.985, 40.748, 10, 6.0),
+    ("paris", 2.349, 48.853, 8, 4.0),
+    ("london", -0.128, 51.507, 7, 6.0),
+    ("tokyo", 139.692, 35.690, 7, 8.0),
+    ("berlin", 13.405, 52.520, 4, 5.0),
+    ("montreal", -73.567, 45.502, 3, 4.0),
+    ("lyon", 4.836, 45.764, 2, 3.0),
+    ("sydney", 151.209, -33.868, 2, 7.0),
+]
+
+HASHTAGS = ["#WolfStep", "#pack", "#howl", "#nightwalk", "#forest", "#city", "#moon", "#trail"]
+WORDS = ["wolf", "walk", "park", "river", "street", "tracks", "moon", "night", "trail", "view", "coffee", "bridge"]
+
+
+class DatasetGenerator:
+    """
+    Builds realistic synthetic WolfStep data for load testing.
+
+    Posts cluster around city hotspots (each city has a few dense
+    neighbourhoods), replies form trees through ``parent_uid`` with popular
+    threads attracting more replies, and likes/views follow a heavy-tailed
+    distribution so a small share of posts gets most of the engagement.
+    """
+
+    def __init__(self, seed: int = 42, days: int = 90, now: Optional[datetime] = None):
+        """
+        Args:
+            seed (int): Random seed, so runs are reproducible.
+            days (int): Posts are spread over this many days before ``now``.
+            now (Optional[datetime]): Reference time (defaults to utcnow).
+        """
+        self.rng = random.Random(seed)
+        self.days = days
+        self.now = now if now else datetime.utcnow()
+        self.neighbourhoods = self._build_neighbourhoods()
+
+    def _build_neighbourhoods(self) -> List[Tuple[float, float, float, float]]:
+        """Split every city into a few weighted sub-hotspots: (lon, lat, weight, spread_km)."""
+        neighbourhoods = []
+        for _, lon, lat, weight, spread_km in CITY_HOTSPOTS:
+            for _ in range(self.rng.randint(3, 6)):
+                d_lon, d_lat = self._offset_degrees(lat, spread_km)
+                neighbourhoods.append((lon + d_lon, lat + d_lat, weight * self.rng.paretovariate(1.5), spread_km / 4))
+        return neighbourhoods
+
+    def _offset_degrees(self, latitude: float, spread_km: float) -> Tuple[float, float]:
+        """Gaussian offset of ``spread_km`` standard deviation, in degrees."""
+        d_lat = self.rng.gauss(0, spread_km) / 111.32
+        d_lon = self.rng.gauss(0, spread_km) / (111.32 * max(0.1, math.cos(math.radians(latitude))))
+        return d_lon, d_lat
+
+    def random_location(self) -> Tuple[float, float]:
+        """A (longitude, latitude) drawn from the hotspot mixture."""
+        lon, lat, _, spread_km = self.rng.choices(self.neighbourhoods, weights=[n[2] for n in self.neighbourhoods])[0]
+        d_lon, d_lat = self._offset_degrees(lat, spread_km)
+        return lon + d_lon, max(-89.9, min(89.9, lat + d_lat))
+
+    def _text(self) -> Tuple[str, str]:
+        words = self.rng.sample(WORDS, self.rng.randint(2, 4))
+        title = " ".join(words).capitalize()
+        tags = " ".join(self.rng.sample(HASHTAGS, self.rng.randint(0, 3)))
+        text = f"{' '.join(self.rng.choices(WORDS, k=self.rng.randint(5, 30)))} {tags}".strip()
+        return title, text
+
+    def _engagement(self) -> Tuple[int, int]:
+        """Heavy-tailed (views, likes): Pareto views, likes a small fraction of views."""
+        views = int(self.rng.paretovariate(1.2) * 5) - 5
+        likes = int(views * self.rng.betavariate(1, 12))
+        return max(0, views), max(0, likes)
+
+    def profiles(self, count: int) -> List[Profile]:
+        """Generate ``count`` profiles."""
+        profiles = []
+        for i in range(count):
+            created = self.now - timedelta(days=self.rng.uniform(0, self.days * 4))
+            profiles.append(Profile(
+                profile_creation_date=created,
+                profiles_updated_date=created + (self.now - created) * self.rng.random(),
+                user_name=f"wolf_{i}",
+                gender=self.rng.choice(["M", "F", "Other", None]),
+                total_post_created=int(self.rng.paretovariate(1.3)) - 1,
+                total_post_visited=int(self.rng.paretovariate(1.1) * 10) - 10,
+                wolf_id=f"wolf-{self.rng.randint(1, 64):03d}",
+                profile_tag=f"@wolf_{i}",
+                profile_level=self.rng.randint(1, 30),
+                profile_exp=self.rng.randint(0, 50000)
+            ))
+        return profiles
+
+    def posts(self, count: int, reply_ratio: float = 0.3) -> List[Post]:
+        """
+        Generate ``count`` posts, about ``reply_ratio`` of which are replies.
+
+        Reply parents are picked by preferential attachment (weight grows with
+        the replies already received), which yields a few deep, busy threads
+        and many short ones.
+        """
+        posts: List[Post] = []
+        attachment: List[int] = []  # Post index repeated once per reply received + 1
+        start = self.now - timedelta(days=self.days)
+        for _ in range(count):
+            title, text = self._text()
+            views, likes = self._engagement()
+            if posts and self.rng.random() < reply_ratio:
+                parent_index = self.rng.choice(attachment)
+                parent = posts[parent_index]
+                parent_lon, parent_lat = parent.geolocation["coordinates"]
+                d_lon, d_lat = self._offset_degrees(parent_lat, 0.2)
+                created = parent.created_at + (self.now - parent.created_at) * self.rng.random() ** 3
+                post = Post(
+                    parent_uid=parent.uid, longitude=parent_lon + d_lon, latitude=parent_lat + d_lat,
+                    created_at=created, title=title, text=text, views_count=views, like_count=likes
+                )
+                parent.reply_count += 1
+                attachment.append(parent_index)
+            else:
+                lon, lat = self.random_location()
+                post = Post(
+                    longitude=lon, latitude=lat, created_at=start + (self.now - start) * self.rng.random(),
+                    title=title, text=text, views_count=views, like_count=likes
+                )
+            attachment.append(len(posts))
+            posts.append(post)
+        return posts
+
+
+def load_dataset(db, posts: List[Post], profiles: List[Profile], batch_size: int = 1000) -> dict:
+    """
+    Load generated data through the bulk insert path and build indexes.
+
+    Args:
+        db (pymongo.database.Database): Target database (mongod or mongomock).
+        posts (List[Post]): Posts to insert.
+        profiles (List[Profile]): Profiles to insert.
+        batch_size (int): Documents per bulk write.
+
+    Returns:
+        dict: Inserted document counts.
+    """
+    post_repository = PostRepository(db)
+    post_repository.ensure_indexes()
+    return {
+        "posts": post_repository.insert_many(posts, batch_size),
+        "profiles": ProfileRepository(db).insert_many(profiles, batch_size)
+    }
+
+
+# Example usage: load a dataset into a local mongod
+if __name__ == "__main__":
+    import argparse
+    from pymongo import MongoClient
+    from common.log import configure_logging
+
+    parser = argparse.ArgumentParser(description="Generate and load a synthetic WolfStep dataset")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--database", default="wolfstep_loadtest")
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--profiles", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    configure_logging()
+
+    generator = DatasetGenerator(seed=args.seed)
+    client = MongoClient(args.uri)
+    counts = load_dataset(client[args.database], generator.posts(args.posts), generator.profiles(args.profiles))
+    print(f"Loaded {counts} into {args.database}")
+    client.close()
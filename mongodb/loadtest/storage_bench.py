@@ -0,0 +1,88 @@
+import zlib
+from typing import Callable, Dict, List
+
+import bson
+
+from mongodb.loadtest.generator import DatasetGenerator
+from mongodb.schemas.Post import Post
+from mongodb.schemas.Profile import Profile
+
+
+def legacy_post_dict(post: Post) -> Dict:
+    """The verbose document layout written before short stored keys."""
+    doc = Post.FIELDS.decode(post.to_mongo_dict())
+    del doc["hashtags"]  # Added after the short keys; never part of the legacy layout
+    doc["geolocation"] = {"type": "Point", "coordinates": doc["geolocation"]}
+    return doc
+
+
+def legacy_profile_dict(profile: Profile) -> Dict:
+    """The verbose document layout written before short stored keys."""
+    return Profile.FIELDS.decode(profile.to_mongo_dict())
+
+
+def available_compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Wire compressors importable here (zlib always is)."""
+    compressors = {"zlib": lambda data: zlib.compress(data, 6)}
+    try:
+        import zstandard
+        compressors["zstd"] = zstandard.ZstdCompressor().compress
+    except ImportError:
+        pass
+    try:
+        import snappy
+        compressors["snappy"] = snappy.compress
+    except ImportError:
+        pass
+    return compressors
+
+
+def viewport_bytes(docs: List[Dict]) -> bytes:
+    """Approximate a find reply carrying ``docs``: one BSON document holding the batch."""
+    return bson.encode({"cursor": {"firstBatch": docs, "id": 0, "ns": "wolfstep.posts"}, "ok": 1.0})
+
+
+def measure(label: str, docs: List[Dict], viewport: List[Dict], compressors: Dict) -> Dict:
+    sizes = [len(bson.encode(doc)) for doc in docs]
+    payload = viewport_bytes(viewport)
+    result = {
+        "avg_document_bytes": round(sum(sizes) / len(sizes), 1),
+        "working_set_mb": round(sum(sizes) / 1e6, 2),
+        "viewport_uncompressed_bytes": len(payload)
+    }
+    for name, compress in compressors.items():
+        result[f"viewport_{name}_bytes"] = len(compress(payload))
+    print(f"{label}: {result}")
+    return result
+
+
+# Example usage: python -m mongodb.loadtest.storage_bench
+if __name__ == "__main__":
+    generator = DatasetGenerator(seed=3)
+    posts = generator.posts(20_000)
+    profiles = generator.profiles(2_000)
+    compressors = available_compressors()
+
+    # A viewport load: the 200 posts closest to a hotspot, as the map would fetch them
+    center_lon, center_lat = generator.random_location()
+    viewport = sorted(
+        posts,
+        key=lambda p: (p.geolocation["coordinates"][0] - center_lon) ** 2 + (p.geolocation["coordinates"][1] - center_lat) ** 2
+    )[:200]
+
+    before = measure("posts, long keys", [legacy_post_dict(p) for p in posts],
+                     [legacy_post_dict(p) for p in viewport], compressors)
+    after = measure("posts, short keys", [p.to_mongo_dict() for p in posts],
+                    [p.to_mongo_dict() for p in viewport], compressors)
+    profile_before = sum(len(bson.encode(legacy_profile_dict(p))) for p in profiles) / len(profiles)
+    profile_after = sum(len(bson.encode(p.to_mongo_dict())) for p in profiles) / len(profiles)
+
+    print(f"Post document: {before['avg_document_bytes']} -> {after['avg_document_bytes']} bytes "
+          f"({1 - after['avg_document_bytes'] / before['avg_document_bytes']:.0%} smaller)")
+    print(f"Profile document: {profile_before:.1f} -> {profile_after:.1f} bytes "
+          f"({1 - profile_after / profile_before:.0%} smaller)")
+    # Like for like per codec: long vs short keys, both uncompressed or both compressed
+    for name in ["uncompressed"] + list(compressors):
+        key = f"viewport_{name}_bytes"
+        print(f"Viewport of 200 posts over the wire ({name}): {before[key]} -> {after[key]} bytes "
+              f"({after[key] / before[key] - 1:+.0%})")
@@ -0,0 +1,405 @@
+import bisect
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from common.log import get_logger
+
+log = get_logger("metrics")
+
+# Latency buckets in seconds, tuned for sub-millisecond to multi-second commands.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Documents returned / written per command.
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Commands whose reply ``n`` counts documents inserted, matched or deleted.
+WRITE_COMMANDS = ("insert", "update", "delete")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus format."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """
+        Estimate a quantile from the buckets (upper bound of the bucket holding it).
+
+        Args:
+            q (float): Quantile in [0, 1], e.g. 0.99.
+
+        Returns:
+            Optional[float]: The estimate, or None if nothing was observed.
+        """
+        series = self._series.get(_label_key(labels))
+        if not series:
+            return None
+        counts = series[0]
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return float("inf")
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                cumulative += counts[-1]
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process store for MongoDB metrics and the slow-query log.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0, slow_log_size: int = 200):
+        """
+        Args:
+            slow_query_ms (float): Commands slower than this are added to the slow-query log.
+            slow_log_size (int): Number of slow queries kept in memory.
+        """
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        self.command_latency = self.histogram(
+            "wolfstep_mongodb_command_seconds", "Command latency by collection and operation")
+        self.docs_returned = self.histogram(
+            "wolfstep_mongodb_docs_returned", "Documents returned per cursor batch", SIZE_BUCKETS)
+        self.docs_written = self.histogram(
+            "wolfstep_mongodb_docs_written", "Documents inserted, matched or deleted per write command", SIZE_BUCKETS)
+        self.command_errors = self.counter(
+            "wolfstep_mongodb_command_errors_total", "Failed commands by collection and operation")
+        self.checkout_wait = self.histogram(
+            "wolfstep_mongodb_pool_checkout_seconds", "Time spent waiting for a pooled connection")
+        self.checkout_failures = self.counter(
+            "wolfstep_mongodb_pool_checkout_failures_total", "Connection checkouts that failed")
+        self.connections_in_use = self.gauge(
+            "wolfstep_mongodb_pool_connections_in_use", "Connections currently checked out")
+        self.server_rtt = self.gauge(
+            "wolfstep_mongodb_server_rtt_seconds", "Last measured round-trip time per server")
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def record_slow_query(self, entry: Dict[str, Any]) -> None:
+        self.slow_queries.append(entry)
+        log.warning("Slow MongoDB query: %s", entry)
+
+    def render_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Default registry shared by every connector in the process.
+REGISTRY = MetricsRegistry()
+
+
+def redact_filter(value: Any) -> Any:
+    """
+    Reduce a query filter to its shape, replacing every literal with ``"?"``.
+
+    Field names and operators are kept so slow queries can be grouped and
+    matched to indexes without logging user data.
+    """
+    if isinstance(value, dict):
+        return {key: redact_filter(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and any(isinstance(item, (dict, list)) for item in value):
+        return [redact_filter(item) for item in value]
+    return "?"
+
+
+def _command_target(command_name: str, command: Dict) -> Tuple[Optional[str], Any]:
+    """Return the collection a command targets and the filter it runs, if any."""
+    if command_name == "getMore":
+        return command.get("collection"), None
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        return None, None
+    if command_name in ("find", "count", "distinct"):
+        return collection, command.get("filter", command.get("query"))
+    if command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or []
+        return collection, statements[0].get("q") if statements else None
+    if command_name == "findAndModify":
+        return collection, command.get("query")
+    if command_name == "aggregate":
+        return collection, [{stage: "..."} for step in command.get("pipeline", []) for stage in step]
+    return collection, None
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records latency, documents returned and slow queries per collection and operation."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self._inflight: Dict[Tuple[Any, int], Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection, query = _command_target(event.command_name, event.command)
+        if collection is None:
+            return
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (collection, query)
+
+    def _finish(self, event):
+        with self._lock:
+            return self._inflight.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        target = self._finish(event)
+        if target is None:
+            return
+        collection, query = target
+        seconds = event.duration_micros / 1_000_000
+        labels = {"collection": collection, "op": event.command_name}
+        self.registry.command_latency.observe(seconds, **labels)
+
+        reply = event.reply or {}
+        cursor = reply.get("cursor")
+        docs = None
+        if cursor is not None:
+            docs = len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+            self.registry.docs_returned.observe(docs, **labels)
+        elif event.command_name in WRITE_COMMANDS:
+            docs = reply.get("n", 0)
+            self.registry.docs_written.observe(docs, **labels)
+
+        if seconds * 1000 >= self.registry.slow_query_ms:
+            self.registry.record_slow_query({
+                "collection": collection,
+                "op": event.command_name,
+                "duration_ms": round(seconds * 1000, 2),
+                "docs": docs,
+                "filter_shape": redact_filter(query) if query is not None else None
+            })
+
+    def failed(self, event):
+        target = self._finish(event)
+        if target is None:
+            return
+        self.registry.command_errors.inc(collection=target[0], op=event.command_name)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Records how long threads wait to check a connection out of the pool."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self._checkout_start = threading.local()
+        self._in_use: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def _adjust_in_use(self, address, delta: int) -> None:
+        with self._lock:
+            self._in_use[address] = self._in_use.get(address, 0) + delta
+            self.registry.connections_in_use.set(self._in_use[address], server=f"{address[0]}:{address[1]}")
+
+    def connection_check_out_started(self, event):
+        self._checkout_start.value = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        # pymongo >= 4.7 reports the wait itself; older drivers need the thread-local start time.
+        duration = getattr(event, "duration", None)
+        started = getattr(self._checkout_start, "value", None)
+        if duration is None and started is not None:
+            duration = time.perf_counter() - started
+        if duration is not None:
+            self.registry.checkout_wait.observe(duration)
+        self._adjust_in_use(event.address, 1)
+
+    def connection_check_out_failed(self, event):
+        self.registry.checkout_failures.inc(reason=event.reason)
+
+    def connection_checked_in(self, event):
+        self._adjust_in_use(event.address, -1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+class ServerMetricsListener(monitoring.ServerListener):
+    """Tracks the round-trip time the driver measures for each server."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+
+    def opened(self, event):
+        pass
+
+    def description_changed(self, event):
+        rtt = event.new_description.round_trip_time
+        if rtt is not None:
+            address = event.server_address
+            self.registry.server_rtt.set(rtt, server=f"{address[0]}:{address[1]}")
+
+    def closed(self, event):
+        pass
+
+
+def create_listeners(registry: MetricsRegistry = REGISTRY) -> list:
+    """
+    Build the listeners to pass as ``MongoClient(event_listeners=...)``.
+    """
+    return [
+        CommandMetricsListener(registry),
+        PoolMetricsListener(registry),
+        ServerMetricsListener(registry)
+    ]
+
+
+def start_exporter(registry: MetricsRegistry = REGISTRY, port: int = 9216, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve ``/metrics`` in Prometheus text format from a daemon thread.
+
+    Args:
+        registry (MetricsRegistry): Registry to expose.
+        port (int): Port to listen on.
+        host (str): Interface to bind. Loopback by default; pass ``"0.0.0.0"``
+            only where the port is firewalled to the Prometheus scraper.
+
+    Returns:
+        ThreadingHTTPServer: The running server (call ``shutdown()`` to stop it).
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood stdout
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
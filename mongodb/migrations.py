@@ -0,0 +1,216 @@
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from common.log import get_logger
+from mongodb.schemas.Post import Post, extract_hashtags
+from mongodb.schemas.Profile import Profile
+from mongodb.schemas.field_map import FieldMap
+from mongodb.tiering import TieringState
+
+log = get_logger("migrations")
+
+F = Post.FIELDS
+
+
+def _coordinates(value):
+    """Legacy GeoJSON Point -> stored [lon, lat] pair."""
+    return list(value["coordinates"]) if isinstance(value, dict) else value
+
+
+# Stored value conversions applied while renaming long keys
+POST_CONVERTERS: Dict[str, Callable] = {"geolocation": _coordinates}
+
+# Legacy fields whose meaning moved to another attribute. Before the visit
+# sketches, views_count was a raw view total: it belongs in view_events,
+# while views_count now holds the unique-viewer estimate set by VisitTracker.
+POST_RENAMES = {"views_count": "view_events"}
+
+# Counters may already have been incremented under their short key since the
+# short keys shipped, so the legacy value is added rather than set.
+POST_COUNTERS = ("views_count", "like_count", "reply_count")
+PROFILE_COUNTERS = ("total_post_created", "total_post_visited", "profile_exp")
+
+
+def _short_key_update(
+    doc: Dict,
+    fields: FieldMap,
+    converters: Dict[str, Callable],
+    counters: Iterable[str],
+    renames: Dict[str, str]
+) -> Optional[UpdateOne]:
+    """
+    Update moving the long keys of one document to their short keys, or None
+    if it has none left. It only matches while the long keys are still there,
+    so applying it twice does not add a counter twice.
+    """
+    legacy = [name for name in fields.aliases if name in doc]
+    if not legacy:
+        return None
+    update: Dict[str, Dict] = {"$unset": {name: "" for name in legacy}}
+    for name in legacy:
+        short, value = fields.field(renames.get(name, name)), doc[name]
+        if name in converters:
+            value = converters[name](value)
+        if name in renames:
+            update.setdefault("$max", {})[fields.field(name)] = 0  # Keep the field readable, never lower it
+        if name in counters:
+            update.setdefault("$inc", {})[short] = value
+        elif short not in doc:
+            update.setdefault("$set", {})[short] = value
+        # Otherwise the short key was written after the deploy and is newer
+    query = {"_id": doc["_id"], **{name: {"$exists": True} for name in legacy}}
+    return UpdateOne(query, update)
+
+
+def migrate_short_keys(
+    collection,
+    fields: FieldMap,
+    converters: Optional[Dict[str, Callable]] = None,
+    counters: Iterable[str] = (),
+    batch_size: int = 500,
+    max_batches: Optional[int] = None,
+    renames: Optional[Dict[str, str]] = None
+) -> Dict:
+    """
+    Rewrite documents stored with long field names to the short keys of ``fields``.
+
+    Documents are read in ``_id`` order and each is updated on its own, only
+    while it still holds the long keys. Migrated documents no longer match
+    the scan, so an interrupted run is resumed by simply running it again.
+
+    Args:
+        collection (pymongo.collection.Collection): Collection to migrate.
+        fields (FieldMap): Aliases of the stored model (``Post.FIELDS``, ...).
+        converters (Optional[Dict[str, Callable]]): Attribute -> conversion of
+            the legacy value (e.g. GeoJSON Point -> [lon, lat]).
+        counters (Iterable[str]): Attributes merged with ``$inc``.
+        batch_size (int): Documents per ``bulk_write`` call.
+        max_batches (Optional[int]): Stop after this many batches (resume later).
+        renames (Optional[Dict[str, str]]): Legacy attribute -> attribute whose
+            short key receives its value (e.g. ``POST_RENAMES``).
+
+    Returns:
+        Dict: Counts of migrated documents and batches.
+    """
+    converters, counters, renames = converters or {}, set(counters), renames or {}
+    legacy_query = {"$or": [{name: {"$exists": True}} for name in fields.aliases]}
+    stats = {"migrated": 0, "batches": 0}
+    last_id = None
+    while max_batches is None or stats["batches"] < max_batches:
+        query = legacy_query if last_id is None else {"$and": [legacy_query, {"_id": {"$gt": last_id}}]}
+        docs = list(collection.find(query).sort([("_id", ASCENDING)]).limit(batch_size))
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        updates = (_short_key_update(doc, fields, converters, counters, renames) for doc in docs)
+        requests = [request for request in updates if request]
+        if requests:
+            stats["migrated"] += collection.bulk_write(requests, ordered=False).modified_count
+        stats["batches"] += 1
+    log.info("Short-key migration of %s: %s", collection.name, stats)
+    return stats
+
+
+def backfill_hashtags(collection, batch_size: int = 500, max_batches: Optional[int] = None) -> Dict:
+    """
+    Store ``hashtags`` on posts written before the field existed.
+
+    Hashtag search only matches the stored array, so older posts are
+    invisible to it until this has run. Posts without hashtags get an empty
+    array, so each post is visited once and an interrupted run is resumed by
+    simply running it again. Run it after
+    ``migrate_short_keys``: it reads the short title and text keys.
+
+    Args:
+        collection (pymongo.collection.Collection): Hot posts or an archive bucket.
+        batch_size (int): Posts per ``bulk_write`` call.
+        max_batches (Optional[int]): Stop after this many batches (resume later).
+
+    Returns:
+        Dict: Counts of updated posts and batches.
+    """
+    title, text, hashtags = F.field("title"), F.field("text"), F.field("hashtags")
+    missing = {hashtags: {"$exists": False}}
+    stats = {"updated": 0, "batches": 0}
+    last_id = None
+    while max_batches is None or stats["batches"] < max_batches:
+        query = missing if last_id is None else {**missing, "_id": {"$gt": last_id}}
+        docs = list(collection.find(query, {title: 1, text: 1}).sort([("_id", ASCENDING)]).limit(batch_size))
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        requests = [
+            UpdateOne(
+                {"_id": doc["_id"], hashtags: {"$exists": False}},
+                {"$set": {hashtags: extract_hashtags(f"{doc.get(title, '')} {doc.get(text, '')}")}}
+            )
+            for doc in docs
+        ]
+        stats["updated"] += collection.bulk_write(requests, ordered=False).modified_count
+        stats["batches"] += 1
+    log.info("Hashtag backfill of %s: %s", collection.name, stats)
+    return stats
+
+
+def legacy_collections(db) -> List[str]:
+    """
+    Collections still holding documents with long field names. Services that
+    query by short keys should refuse to start while this is not empty.
+    """
+    pending = []
+    for name, fields in _targets(db):
+        if db[name].find_one({"$or": [{key: {"$exists": True}} for key in fields.aliases]}, {"_id": 1}):
+            pending.append(name)
+    return pending
+
+
+def _targets(db):
+    """(collection name, field map) of every collection stored with short keys."""
+    yield "profiles", Profile.FIELDS
+    yield "posts", Post.FIELDS
+    for bucket in TieringState(db).buckets:
+        yield bucket, Post.FIELDS
+
+
+def migrate_all(db, batch_size: int = 500) -> Dict[str, Dict]:
+    """
+    Migrate profiles, hot posts and every archive bucket to short keys, then
+    backfill the hashtags of posts.
+
+    Returns:
+        Dict[str, Dict]: Collection name -> stats of ``migrate_short_keys``
+        (plus ``hashtags``, the stats of ``backfill_hashtags``, for posts).
+    """
+    results = {}
+    for name, fields in _targets(db):
+        if fields is Post.FIELDS:
+            results[name] = migrate_short_keys(
+                db[name], fields, POST_CONVERTERS, POST_COUNTERS, batch_size, renames=POST_RENAMES
+            )
+            results[name]["hashtags"] = backfill_hashtags(db[name], batch_size)
+        else:
+            results[name] = migrate_short_keys(db[name], fields, counters=PROFILE_COUNTERS, batch_size=batch_size)
+    return results
+
+
+# Example usage: python -m mongodb.migrations --check
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from common.log import configure_logging
+    from mongodb.mongodb import MongoDBConnector
+
+    parser = argparse.ArgumentParser(description="Rewrite legacy long-key documents to short keys, backfill hashtags")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--check", action="store_true", help="Only list collections that still need migrating")
+    args = parser.parse_args()
+    configure_logging()
+
+    with MongoDBConnector() as connector:
+        db = connector.get_database()
+        if args.check:
+            pending = legacy_collections(db)
+            print("Pending:", ", ".join(pending) if pending else "none")
+            sys.exit(1 if pending else 0)
+        migrate_all(db, args.batch_size)
@@ -4,19 +4,51 @@ from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 from typing import Dict, Any
 from datetime import datetime, timezone
+from common.log import get_logger
+from mongodb.metrics import REGISTRY, MetricsRegistry, create_listeners, start_exporter
+
+log = get_logger("db")
+
+# Wire compressors in order of preference; the server picks the first it supports.
+DEFAULT_COMPRESSORS = "zstd,snappy,zlib"
 
 class MongoDBConnector:
-    def __init__(self, config_path: str = ".config/mongodb_connection_string.yaml", env: str = "dev"):
+    def __init__(
+        self,
+        config_path: str = ".config/mongodb_connection_string.yaml",
+        env: str = "dev",
+        metrics: MetricsRegistry = REGISTRY
+    ):
         """
         Initialize the MongoDB connector with a YAML config file.
 
+        The optional ``metrics`` section of the environment config controls
+        instrumentation::
+
+            metrics:
+              enabled: true          # register command/pool/server listeners
+              slow_query_ms: 100     # threshold for the slow-query log
+              exporter_port: 9216    # serve /metrics for Prometheus (omit to disable)
+              exporter_host: 0.0.0.0 # interface to bind (defaults to 127.0.0.1)
+
+        Wire compression is negotiated from the ``compressors`` key (defaults
+        to ``zstd,snappy,zlib``); pymongo skips codecs whose library is missing.
+
+        Connection and slow-query messages go to the ``wolfstep.db`` and
+        ``wolfstep.metrics`` loggers. Entry points must call
+        ``common.log.configure_logging()`` first (as ``mongodb.tiering`` does);
+        otherwise Python's last-resort handler only shows warnings and errors.
+
         Args:
             config_path (str): Path to the YAML configuration file.
             env (str): Environment to use (dev, uat, prod). Defaults to 'dev'.
+            metrics (MetricsRegistry): Registry receiving the driver metrics.
         """
         self.config_path = config_path
         self.env = os.getenv("MONGO_ENV", env)  # Override with env var if set
         self.config = self._load_config()
+        self.metrics = metrics
+        self.metrics_exporter = None
         self.client = None
         self.db = None
         self._connect()
@@ -48,14 +80,29 @@ class MongoDBConnector:
         Raises:
             ConnectionFailure: If the connection to MongoDB fails.
         """
+        metrics_config = self.config.get("metrics", {})
+        event_listeners = []
+        if metrics_config.get("enabled", True):
+            self.metrics.slow_query_ms = metrics_config.get("slow_query_ms", self.metrics.slow_query_ms)
+            event_listeners = create_listeners(self.metrics)
         try:
-            self.client = MongoClient(self.config["uri"])
+            self.client = MongoClient(
+                self.config["uri"],
+                compressors=self.config.get("compressors", DEFAULT_COMPRESSORS),
+                event_listeners=event_listeners
+            )
             # Test the connection
             self.client.admin.command("ping")
             self.db = self.client[self.config["database"]]
-            print(f"Connected to MongoDB: {self.config['database']} (env: {self.env})")
+            log.info("Connected to MongoDB: %s (env: %s)", self.config["database"], self.env)
         except ConnectionFailure as e:
             raise ConnectionFailure(f"Failed to connect to MongoDB: {e}")
+        if event_listeners and metrics_config.get("exporter_port"):
+            self.metrics_exporter = start_exporter(
+                self.metrics,
+                port=metrics_config["exporter_port"],
+                host=metrics_config.get("exporter_host", "127.0.0.1")
+            )
 
     def get_database(self):
         """
@@ -86,9 +133,12 @@ class MongoDBConnector:
         """
         if self.client:
             self.client.close()
-            print("MongoDB connection closed")
+            log.info("MongoDB connection closed")
             self.client = None
             self.db = None
+        if self.metrics_exporter:
+            self.metrics_exporter.shutdown()
+            self.metrics_exporter = None
 
     def __enter__(self):
         """
@@ -108,6 +158,8 @@ class MongoDBConnector:
 
 if __name__ == "__main__":
     # Optionally set environment variable in shell: export MONGO_ENV=dev
+    from common.log import configure_logging
+    configure_logging()
     connector = MongoDBConnector()
 
     # Access the 'posts' collection and insert a sample document
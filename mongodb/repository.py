@@ -0,0 +1,297 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, InsertOne
+
+from mongodb.schemas.Post import Post
+from mongodb.schemas.Profile import Profile
+from mongodb.schemas.lazy import BatchLoader
+from mongodb.tiering import LOCATOR_COLLECTION, TieringState, buckets_between
+
+POSTS_COLLECTION = "posts"
+PROFILES_COLLECTION = "profiles"
+
+# Stored-key translation for posts (see ``Post.FIELDS``)
+F = Post.FIELDS
+ARCHIVE_KEY = F.field("archive_bucket")
+
+
+def _distance_m(longitude: float, latitude: float, post: Post) -> float:
+    """Haversine distance in meters from a point to a post."""
+    lon, lat = post.geolocation["coordinates"]
+    lat1, lat2 = math.radians(latitude), math.radians(lat)
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lon - longitude) / 2) ** 2)
+    return 2 * 6371008.8 * math.asin(math.sqrt(min(1.0, a)))
+
+
+class PostRepository:
+    """
+    Queries and writes against the ``posts`` collection and its archive tiers.
+
+    Recent posts live in the hot ``posts`` collection; ``PostTiering`` moves
+    older ones to monthly archive collections. Geo queries only read archives
+    when their ``since`` bound reaches past the archive horizon. Id and
+    thread lookups and updates that miss the hot tier go through the
+    ``post_locations`` locator to the bucket holding the post.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db (pymongo.database.Database): The WolfStep database.
+        """
+        self.db = db
+        self.collection = db[POSTS_COLLECTION]
+        self.locator = db[LOCATOR_COLLECTION]
+        self.tiers = TieringState(db)
+
+    def _find(self, query, fields: Optional[Sequence[str]] = None, collection=None):
+        """
+        Run ``find`` with an optional projection.
+
+        Returns the cursor and the loader that hydrated posts should share, so
+        fields left out of the projection are fetched in one batch on first access.
+        """
+        collection = collection if collection is not None else self.collection
+        if fields is None:
+            return collection.find(query), None
+        loader = BatchLoader(collection, Post, prefetch=Post.CARD_FIELDS)
+        return collection.find(query, F.projection(fields)), loader
+
+    def _archived(self, locations: List[Dict], fields: Optional[Sequence[str]] = None) -> List[Post]:
+        """Posts named by locator entries, with one ``$in`` query per bucket."""
+        by_bucket: Dict[str, List[str]] = {}
+        for location in locations:
+            by_bucket.setdefault(location[ARCHIVE_KEY], []).append(location["_id"])
+        posts = []
+        for bucket, ids in by_bucket.items():
+            cursor, loader = self._find({"_id": {"$in": ids}}, fields, self.db[bucket])
+            posts.extend(Post.from_mongo_dict(doc, loader) for doc in cursor)
+        return posts
+
+    def ensure_indexes(self) -> None:
+        """
+        Create the indexes the queries below rely on.
+        """
+        self.collection.create_index([(F.field("geolocation"), GEOSPHERE), (F.field("created_at"), DESCENDING)])
+        self.collection.create_index([(F.field("parent_uid"), ASCENDING), (F.field("created_at"), ASCENDING)])
+        # Search (see mongodb/search.py): one text index per collection, plus hashtags with and without location
+        self.collection.create_index(
+            [(F.field("title"), TEXT), (F.field("text"), TEXT)],
+            weights={F.field("title"): 3, F.field("text"): 1},
+            default_language="none",
+            name="post_text"
+        )
+        self.collection.create_index([(F.field("hashtags"), ASCENDING), (F.field("geolocation"), GEOSPHERE)])
+        self.collection.create_index([(F.field("hashtags"), ASCENDING), (F.field("created_at"), DESCENDING)])
+
+    def insert_many(self, posts: Iterable[Post], batch_size: int = 1000) -> int:
+        """
+        Bulk-insert posts in unordered batches.
+
+        Args:
+            posts (Iterable[Post]): Posts to insert.
+            batch_size (int): Documents per ``bulk_write`` call.
+
+        Returns:
+            int: Number of inserted documents.
+        """
+        inserted = 0
+        batch = []
+        for post in posts:
+            batch.append(InsertOne(post.to_mongo_dict()))
+            if len(batch) >= batch_size:
+                inserted += self.collection.bulk_write(batch, ordered=False).inserted_count
+                batch = []
+        if batch:
+            inserted += self.collection.bulk_write(batch, ordered=False).inserted_count
+        return inserted
+
+    def create(self, post: Post) -> str:
+        """
+        Insert a single post.
+
+        Returns:
+            str: The post uid.
+        """
+        self.collection.insert_one(post.to_mongo_dict())
+        return post.uid
+
+    def get(self, uid: str, fields: Optional[Sequence[str]] = None) -> Optional[Post]:
+        """
+        Fetch a post by uid, or None if it does not exist.
+
+        Args:
+            uid (str): Post uid.
+            fields (Optional[Sequence[str]]): Fields to fetch (all if None).
+        """
+        cursor, loader = self._find({"_id": uid}, fields)
+        doc = next(cursor.limit(1), None)
+        if doc is not None:
+            return Post.from_mongo_dict(doc, loader)
+        location = self.locator.find_one({"_id": uid})
+        posts = self._archived([location], fields) if location else []
+        return posts[0] if posts else None
+
+    def near(
+        self,
+        longitude: float,
+        latitude: float,
+        radius_m: float,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Post]:
+        """
+        Posts within ``radius_m`` meters of a point, nearest first.
+
+        Without ``since`` only the hot tier is searched; archive buckets are
+        added when ``since`` is older than the archive horizon.
+
+        Args:
+            longitude (float): Longitude in decimal degrees.
+            latitude (float): Latitude in decimal degrees.
+            radius_m (float): Search radius in meters.
+            limit (int): Maximum number of posts.
+            fields (Optional[Sequence[str]]): Fields to fetch, e.g. ``Post.PIN_FIELDS``
+                for map pins (all if None). Other fields load lazily.
+            since (Optional[datetime]): Only posts created at or after this time.
+            until (Optional[datetime]): Only posts created before this time.
+        """
+        query = {
+            "geolocation": {
+                "$nearSphere": {
+                    "$geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+                    "$maxDistance": radius_m
+                }
+            }
+        }
+        since_iso = since.isoformat() if since else None
+        until_iso = until.isoformat() if until else None
+        window = {}
+        if since_iso:
+            window["$gte"] = since_iso
+        if until_iso:
+            window["$lt"] = until_iso
+        if window:
+            query["created_at"] = window
+        query = F.query(query)
+
+        cursor, loader = self._find(query, fields)
+        posts = [Post.from_mongo_dict(doc, loader) for doc in cursor.limit(limit)]
+        if not self.tiers.needs_archive(since_iso):
+            return posts
+
+        end = min(until_iso, self.tiers.horizon) if until_iso else self.tiers.horizon
+        for bucket in buckets_between(since_iso, end, self.tiers.buckets):
+            cursor, loader = self._find(query, fields, self.db[bucket])
+            posts.extend(Post.from_mongo_dict(doc, loader) for doc in cursor.limit(limit))
+        # A post whose move was interrupted can be in both tiers
+        posts = list({post.uid: post for post in reversed(posts)}.values())
+        posts.sort(key=lambda post: _distance_m(longitude, latitude, post))
+        return posts[:limit]
+
+    def thread(self, uid: str, limit: int = 200, fields: Optional[Sequence[str]] = None) -> List[Post]:
+        """
+        Direct replies to a post, oldest first.
+
+        Args:
+            uid (str): Uid of the parent post.
+            limit (int): Maximum number of replies.
+            fields (Optional[Sequence[str]]): Fields to fetch (all if None).
+        """
+        query, order = F.query({"parent_uid": uid}), F.sort([("created_at", ASCENDING)])
+        cursor, loader = self._find(query, fields)
+        posts = [Post.from_mongo_dict(doc, loader) for doc in cursor.sort(order).limit(limit)]
+        if self.tiers.horizon is None:
+            return posts  # Nothing archived yet
+        archived = self._archived(list(self.locator.find(query).sort(order).limit(limit)), fields)
+        hot = {post.uid for post in posts}
+        posts.extend(post for post in archived if post.uid not in hot)
+        posts.sort(key=lambda post: (post.created_at, post.uid))
+        return posts[:limit]
+
+    def locate(self, uids: Iterable[str]) -> Dict:
+        """
+        Collection currently holding each existing post, hot or archive bucket.
+
+        Returns:
+            Dict[str, pymongo.collection.Collection]: Uid -> collection; unknown uids are left out.
+        """
+        uids = list(uids)
+        found = {doc["_id"]: self.collection for doc in self.collection.find({"_id": {"$in": uids}}, {"_id": 1})}
+        missing = [uid for uid in uids if uid not in found]
+        if missing:
+            for location in self.locator.find({"_id": {"$in": missing}}, {ARCHIVE_KEY: 1}):
+                found[location["_id"]] = self.db[location[ARCHIVE_KEY]]
+        return found
+
+    def update(self, uid: str, update: Dict) -> None:
+        """Apply an update to a post in whichever tier holds it."""
+        update = F.update(update)
+        if self.collection.update_one({"_id": uid}, update).matched_count:
+            return
+        location = self.locator.find_one({"_id": uid}, {ARCHIVE_KEY: 1})
+        if location:
+            self.db[location[ARCHIVE_KEY]].update_one({"_id": uid}, update)
+
+    def like(self, uid: str) -> None:
+        """Increment the like counter of a post."""
+        self.update(uid, {"$inc": {"like_count": 1}})
+
+    def add_view(self, uid: str) -> None:
+        """
+        Increment the raw view counter of a post. ``views_count`` counts
+        unique viewers and is maintained by ``mongodb.visits.VisitTracker``.
+        """
+        self.update(uid, {"$inc": {"view_events": 1}})
+
+
+class ProfileRepository:
+    """
+    Queries and writes against the ``profiles`` collection.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db (pymongo.database.Database): The WolfStep database.
+        """
+        self.db = db
+        self.collection = db[PROFILES_COLLECTION]
+
+    def insert_many(self, profiles: Iterable[Profile], batch_size: int = 1000) -> int:
+        """
+        Bulk-insert profiles in unordered batches.
+
+        Returns:
+            int: Number of inserted documents.
+        """
+        inserted = 0
+        batch = []
+        for profile in profiles:
+            batch.append(InsertOne(profile.to_mongo_dict()))
+            if len(batch) >= batch_size:
+                inserted += self.collection.bulk_write(batch, ordered=False).inserted_count
+                batch = []
+        if batch:
+            inserted += self.collection.bulk_write(batch, ordered=False).inserted_count
+        return inserted
+
+    def get(self, uid: str, fields: Optional[Sequence[str]] = None) -> Optional[Profile]:
+        """
+        Fetch a profile by uid, or None if it does not exist.
+
+        Args:
+            uid (str): Profile uid.
+            fields (Optional[Sequence[str]]): Fields to fetch, e.g. ``Profile.TAG_FIELDS``
+                (all if None). Other fields load lazily.
+        """
+        if fields is None:
+            doc = self.collection.find_one({"_id": uid})
+            return Profile.from_mongo_dict(doc) if doc else None
+        doc = self.collection.find_one({"_id": uid}, Profile.FIELDS.projection(fields))
+        return Profile.from_mongo_dict(doc, BatchLoader(self.collection, Profile)) if doc else None
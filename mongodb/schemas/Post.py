@@ -1,12 +1,68 @@
 from typing import List, Dict, Optional, Union
 from datetime import datetime
+import re
 import uuid
 from pymongo import GEOSPHERE
+from mongodb.schemas.field_map import FieldMap
+from mongodb.schemas.lazy import BatchLoader, LazyDocument
 
 # Assuming MongoDB connection is set up elsewhere
 # Example: client = MongoClient("mongodb://localhost:27017/"); db = client["wolfstep"]
 
-class Post:
+HASHTAG_PATTERN = re.compile(r"#(\w+)")
+
+
+def extract_hashtags(text: str) -> List[str]:
+    """Unique lowercase hashtags in order of appearance, without the '#'."""
+    return list(dict.fromkeys(tag.lower() for tag in HASHTAG_PATTERN.findall(text)))
+
+
+def _geojson_point(value) -> Dict:
+    """Stored [lon, lat] pair (or legacy GeoJSON Point) -> GeoJSON Point."""
+    coordinates = value["coordinates"] if isinstance(value, dict) else value
+    return {"type": "Point", "coordinates": list(coordinates)}
+
+
+class Post(LazyDocument):
+    # Short keys stored in MongoDB. The location is stored as a legacy
+    # [lon, lat] pair, which 2dsphere indexes and GeoJSON queries accept.
+    FIELDS = FieldMap(
+        {
+            "parent_uid": "p",
+            "geolocation": "g",
+            "created_at": "c",
+            "title": "t",
+            "text": "x",
+            "medias": "m",
+            "views_count": "vc",  # Unique viewers, estimated by mongodb/visits.py
+            "view_events": "ve",  # Raw view count (every view, not model state)
+            "like_count": "lc",
+            "reply_count": "rc",
+            "sync_ops": "so",
+            "archive_bucket": "ab",
+            "hashtags": "ht"
+        },
+        paths={"geolocation.coordinates": "g"}
+    )
+
+    # Stored value -> attribute, with the same normalization as __init__
+    STORED_CONVERTERS = {
+        "parent_uid": lambda value: value,
+        "geolocation": _geojson_point,
+        "created_at": datetime.fromisoformat,
+        "title": lambda value: value[:100],
+        "text": lambda value: value[:280],
+        "medias": lambda value: value if value is not None else [],
+        "views_count": lambda value: max(0, value),
+        "like_count": lambda value: max(0, value),
+        "reply_count": lambda value: max(0, value)
+    }
+    OPTIONAL_DEFAULTS = {"parent_uid": None}
+
+    # Projections for the common read paths
+    PIN_FIELDS = ["geolocation"]
+    CARD_FIELDS = ["geolocation", "created_at", "title", "views_count", "like_count", "reply_count"]
+
     def __init__(
         self,
         uid: str = None,
@@ -33,7 +89,7 @@ class Post:
             title (str): Short title of the post (max 100 chars).
             text (str): Main content of the post (max 280 chars).
             medias (List[Dict]): List of media objects with type, url, and optional description.
-            views_count (int): Number of views.
+            views_count (int): Number of unique viewers.
             like_count (int): Number of likes.
             reply_count (int): Number of replies.
         """
@@ -53,42 +109,40 @@ class Post:
 
     def to_mongo_dict(self) -> Dict:
         """
-        Convert the Post object to a MongoDB-compatible dictionary.
+        Convert the Post object to a MongoDB-compatible dictionary with short stored keys.
         """
-        return {
+        return self.FIELDS.encode({
             "_id": self.uid,  # Use uid as MongoDB's primary key
             "parent_uid": self.parent_uid,
-            "geolocation": self.geolocation,
+            "geolocation": self.geolocation["coordinates"],  # Legacy [lon, lat] pair
             "created_at": self.created_at.isoformat(),  # Store as ISO string
             "title": self.title,
             "text": self.text,
             "medias": self.medias,
             "views_count": self.views_count,
             "like_count": self.like_count,
-            "reply_count": self.reply_count
-        }
+            "reply_count": self.reply_count,
+            "hashtags": self.hashtags  # Derived, indexed for hashtag search
+        })
+
+    @property
+    def hashtags(self) -> List[str]:
+        """Hashtags used in the title and text (e.g. ``#WolfStep`` -> ``wolfstep``)."""
+        return extract_hashtags(f"{self.title} {self.text}")
 
     @classmethod
-    def from_mongo_dict(cls, mongo_data: Dict) -> 'Post':
+    def from_mongo_dict(cls, mongo_data: Dict, loader: Optional[BatchLoader] = None) -> 'Post':
         """
-        Create a Post object from a MongoDB document.
+        Create a Post object from a MongoDB document (short or legacy long keys).
+
+        The document may be projected: fields it lacks are loaded on first
+        access through ``loader``, or raise AttributeError without one.
 
         Args:
             mongo_data (Dict): MongoDB document data.
+            loader (Optional[BatchLoader]): Loader shared by the result set.
         """
-        return cls(
-            uid=mongo_data["_id"],
-            parent_uid=mongo_data.get("parent_uid"),
-            longitude=mongo_data["geolocation"]["coordinates"][0],
-            latitude=mongo_data["geolocation"]["coordinates"][1],
-            created_at=datetime.fromisoformat(mongo_data["created_at"]),
-            title=mongo_data["title"],
-            text=mongo_data["text"],
-            medias=mongo_data["medias"],
-            views_count=mongo_data["views_count"],
-            like_count=mongo_data["like_count"],
-            reply_count=mongo_data["reply_count"]
-        )
+        return cls._hydrate(mongo_data, loader)
 
     def validate(self) -> bool:
         """
@@ -138,7 +192,7 @@ if __name__ == "__main__":
     db = client["wolfstep"]
     
     # Create a 2dsphere index for geospatial queries
-    db.posts.create_index([("geolocation", GEOSPHERE)])
+    db.posts.create_index([(Post.FIELDS.field("geolocation"), GEOSPHERE)])
 
     # Insert post
     db.posts.insert_one(mongo_data)
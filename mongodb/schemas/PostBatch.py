@@ -0,0 +1,279 @@
+from typing import Dict, Iterable, List, Optional, Union
+from datetime import datetime, timezone
+import warnings
+
+import numpy as np
+
+from mongodb.schemas.Post import Post
+from mongodb.schemas.lazy import BatchLoader
+
+EARTH_RADIUS_M = 6371008.8  # Mean Earth radius in meters
+
+
+def _to_epoch(value: Union[str, datetime]) -> float:
+    """Convert a stored ``created_at`` (ISO string or datetime) to UTC epoch seconds."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # Posts store naive UTC timestamps
+    return value.timestamp()
+
+
+def _to_epochs(values: List[Optional[Union[str, datetime]]]) -> np.ndarray:
+    """
+    Vectorized ``_to_epoch`` (None -> NaN).
+
+    Naive ISO strings, which is what ``Post.to_mongo_dict`` stores, are parsed
+    by NumPy in one call. Values it cannot take as naive UTC (offsets,
+    aware datetimes) fall back to ``_to_epoch`` row by row.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # NumPy only warns when it drops a timezone offset
+            parsed = np.array(values, dtype="datetime64[us]")
+    except (ValueError, TypeError, DeprecationWarning, UserWarning):
+        return np.array([np.nan if value is None else _to_epoch(value) for value in values], dtype=np.float64)
+    epochs = parsed.astype(np.int64) / 1e6
+    epochs[np.isnat(parsed)] = np.nan
+    return epochs
+
+
+class PostBatch:
+    """
+    Column-oriented view over a set of posts.
+
+    Coordinates, timestamps and counters live in NumPy arrays so distance,
+    bounding-box and time filters run as vectorized operations. The source
+    documents are kept alongside and only turned into ``Post`` objects for the
+    rows that survive filtering.
+    """
+
+    def __init__(
+        self,
+        docs: List[Dict],
+        lon: np.ndarray,
+        lat: np.ndarray,
+        created_at: np.ndarray,
+        views_count: np.ndarray,
+        like_count: np.ndarray,
+        reply_count: np.ndarray
+    ):
+        """
+        Build a batch from already aligned columns. Prefer ``from_documents``.
+
+        Args:
+            docs (List[Dict]): MongoDB documents, one per row.
+            lon (np.ndarray): Longitudes in decimal degrees.
+            lat (np.ndarray): Latitudes in decimal degrees.
+            created_at (np.ndarray): Creation time as UTC epoch seconds.
+            views_count (np.ndarray): Views per post.
+            like_count (np.ndarray): Likes per post.
+            reply_count (np.ndarray): Replies per post.
+        """
+        self.docs = docs
+        self.lon = lon
+        self.lat = lat
+        self.created_at = created_at
+        self.views_count = views_count
+        self.like_count = like_count
+        self.reply_count = reply_count
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict]) -> 'PostBatch':
+        """
+        Hydrate a batch from stored MongoDB documents, e.g. a pymongo cursor.
+
+        The cursor is consumed in a single pass; each field is appended to a
+        flat list and converted to an array once at the end, timestamps
+        included (see ``_to_epochs``).
+
+        Args:
+            documents (Iterable[Dict]): Post documents with stored keys (projections
+                need at least ``Post.PIN_FIELDS``).
+        """
+        field = Post.FIELDS.field
+        geo_key, created_key = field("geolocation"), field("created_at")
+        views_key, likes_key, replies_key = field("views_count"), field("like_count"), field("reply_count")
+        docs, lon, lat, created, views, likes, replies = [], [], [], [], [], [], []
+        for doc in documents:
+            coordinates = doc[geo_key]
+            docs.append(doc)
+            lon.append(coordinates[0])
+            lat.append(coordinates[1])
+            created.append(doc.get(created_key))  # Pin projections omit it
+            views.append(doc.get(views_key, 0))
+            likes.append(doc.get(likes_key, 0))
+            replies.append(doc.get(replies_key, 0))
+        return cls(
+            docs,
+            np.asarray(lon, dtype=np.float64),
+            np.asarray(lat, dtype=np.float64),
+            _to_epochs(created),
+            np.asarray(views, dtype=np.int64),
+            np.asarray(likes, dtype=np.int64),
+            np.asarray(replies, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Post]) -> 'PostBatch':
+        """Build a batch from ``Post`` objects (e.g. the client viewport cache)."""
+        return cls.from_documents(post.to_mongo_dict() for post in posts)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def select(self, rows: np.ndarray) -> 'PostBatch':
+        """
+        Return a new batch with the given rows.
+
+        Args:
+            rows (np.ndarray): Boolean mask or integer indices.
+        """
+        indices = np.flatnonzero(rows) if rows.dtype == bool else rows
+        return PostBatch(
+            [self.docs[i] for i in indices],
+            self.lon[indices],
+            self.lat[indices],
+            self.created_at[indices],
+            self.views_count[indices],
+            self.like_count[indices],
+            self.reply_count[indices]
+        )
+
+    def distance_to(self, longitude: float, latitude: float) -> np.ndarray:
+        """
+        Great-circle (haversine) distance in meters from a point to every post.
+
+        Args:
+            longitude (float): Reference longitude in decimal degrees.
+            latitude (float): Reference latitude in decimal degrees.
+        """
+        lat1 = np.radians(latitude)
+        lat2 = np.radians(self.lat)
+        dlat = lat2 - lat1
+        dlon = np.radians(self.lon - longitude)
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def bearing_from(self, longitude: float, latitude: float) -> np.ndarray:
+        """
+        Initial bearing in degrees (0° = north, clockwise) from a point to every post.
+
+        Args:
+            longitude (float): Reference longitude in decimal degrees.
+            latitude (float): Reference latitude in decimal degrees.
+        """
+        lat1 = np.radians(latitude)
+        lat2 = np.radians(self.lat)
+        dlon = np.radians(self.lon - longitude)
+        x = np.sin(dlon) * np.cos(lat2)
+        y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        return np.degrees(np.arctan2(x, y)) % 360.0
+
+    def within_radius(self, longitude: float, latitude: float, radius_m: float) -> 'PostBatch':
+        """Posts within ``radius_m`` meters of a point."""
+        return self.select(self.distance_to(longitude, latitude) <= radius_m)
+
+    def within_bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> 'PostBatch':
+        """
+        Posts inside a viewport. A box with ``min_lon > max_lon`` crosses the antimeridian.
+        """
+        lat_ok = (self.lat >= min_lat) & (self.lat <= max_lat)
+        if min_lon <= max_lon:
+            lon_ok = (self.lon >= min_lon) & (self.lon <= max_lon)
+        else:
+            lon_ok = (self.lon >= min_lon) | (self.lon <= max_lon)
+        return self.select(lat_ok & lon_ok)
+
+    def within_time_window(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> 'PostBatch':
+        """Posts created in ``[start, end)``; either bound may be omitted."""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.created_at >= _to_epoch(start)
+        if end is not None:
+            mask &= self.created_at < _to_epoch(end)
+        return self.select(mask)
+
+    def top_k(self, scores: np.ndarray, k: int) -> 'PostBatch':
+        """
+        The ``k`` highest-scoring posts, best first.
+
+        Uses ``argpartition`` so only the selected rows are fully sorted.
+
+        Args:
+            scores (np.ndarray): One score per row.
+            k (int): Number of rows to keep.
+        """
+        if k <= 0 or len(self) == 0:
+            return self.select(np.empty(0, dtype=np.int64))
+        if k < len(self):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(self))
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return self.select(order)
+
+    def to_posts(self, loader: Optional[BatchLoader] = None) -> List[Post]:
+        """
+        Convert the rows of this batch to ``Post`` objects.
+
+        Args:
+            loader (Optional[BatchLoader]): Loader for fields missing from projected documents.
+        """
+        return [Post.from_mongo_dict(doc, loader) for doc in self.docs]
+
+
+# Example usage: benchmark against a pure-Python loop, both starting from the raw documents
+if __name__ == "__main__":
+    import math
+    import random
+    import time
+
+    random.seed(7)
+    center_lon, center_lat = -73.935242, 40.730610
+    docs = [
+        Post(
+            longitude=center_lon + random.uniform(-0.2, 0.2),
+            latitude=center_lat + random.uniform(-0.2, 0.2),
+            views_count=random.randint(0, 5000),
+            like_count=random.randint(0, 500)
+        ).to_mongo_dict()
+        for _ in range(100_000)
+    ]
+
+    def python_loop():
+        posts = [Post.from_mongo_dict(doc) for doc in docs]
+        lat1 = math.radians(center_lat)
+        ranked = []
+        for post in posts:
+            lon, lat = post.geolocation["coordinates"]
+            lat2 = math.radians(lat)
+            a = (math.sin((lat2 - lat1) / 2) ** 2
+                 + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lon - center_lon) / 2) ** 2)
+            distance = 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+            if distance <= 2000:
+                ranked.append((post.like_count / (1 + distance), post))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [post for _, post in ranked[:50]]
+
+    def vectorized(batch):
+        distance = batch.distance_to(center_lon, center_lat)
+        nearby = batch.select(distance <= 2000)
+        scores = nearby.like_count / (1 + distance[distance <= 2000])
+        return nearby.top_k(scores, 50).to_posts()
+
+    start = time.perf_counter()
+    expected = python_loop()
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = PostBatch.from_documents(docs)
+    hydrate = time.perf_counter() - start
+    result = vectorized(batch)
+    numpy_time = time.perf_counter() - start
+
+    assert [p.uid for p in result] == [p.uid for p in expected]
+    print(f"Rows: {len(batch)}, end to end from the stored documents")
+    print(f"Post objects + Python loop: {loop_time * 1000:.1f} ms")
+    print(f"PostBatch: {numpy_time * 1000:.1f} ms ({loop_time / numpy_time:.1f}x faster), "
+          f"of which hydration {hydrate * 1000:.1f} ms")
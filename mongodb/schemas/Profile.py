@@ -2,8 +2,50 @@ from typing import Dict, Optional
 from datetime import datetime, timezone
 import uuid
 from pymongo import MongoClient  # For example usage only
+from mongodb.schemas.field_map import FieldMap
+from mongodb.schemas.lazy import BatchLoader, LazyDocument
+
+def _parse_optional_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class Profile(LazyDocument):
+    # Short keys stored in MongoDB
+    FIELDS = FieldMap({
+        "profile_creation_date": "pc",
+        "profiles_updated_date": "pu",
+        "user_name": "un",
+        "gender": "gd",
+        "birth_date": "bd",
+        "total_post_created": "tpc",
+        "total_post_visited": "tpv",
+        "wolf_id": "w",
+        "bio": "b",
+        "profile_tag": "pt",
+        "profile_level": "lv",
+        "profile_exp": "xp"
+    })
+
+    # Stored value -> attribute, with the same normalization as __init__
+    STORED_CONVERTERS = {
+        "profile_creation_date": datetime.fromisoformat,
+        "profiles_updated_date": datetime.fromisoformat,
+        "user_name": lambda value: value[:50],
+        "gender": lambda value: value,
+        "birth_date": _parse_optional_date,
+        "total_post_created": lambda value: max(0, value),
+        "total_post_visited": lambda value: max(0, value),
+        "wolf_id": lambda value: value,
+        "bio": lambda value: value[:200],
+        "profile_tag": lambda value: value[:20],
+        "profile_level": lambda value: max(1, value),
+        "profile_exp": lambda value: max(0, value)
+    }
+    OPTIONAL_DEFAULTS = {"gender": None, "birth_date": None}
+
+    # Projection for avatars and name tags
+    TAG_FIELDS = ["user_name", "profile_tag", "wolf_id", "profile_level"]
 
-class Profile:
     def __init__(
         self,
         uid: str = None,
@@ -54,9 +96,9 @@ class Profile:
 
     def to_mongo_dict(self) -> Dict:
         """
-        Convert the UserProfile object to a MongoDB-compatible dictionary.
+        Convert the UserProfile object to a MongoDB-compatible dictionary with short stored keys.
         """
-        return {
+        return self.FIELDS.encode({
             "_id": self.uid,  # Use uid as MongoDB's primary key
             "profile_creation_date": self.profile_creation_date.isoformat(),
             "profiles_updated_date": self.profiles_updated_date.isoformat(),
@@ -70,31 +112,21 @@ class Profile:
             "profile_tag": self.profile_tag,
             "profile_level": self.profile_level,
             "profile_exp": self.profile_exp
-        }
+        })
 
     @classmethod
-    def from_mongo_dict(cls, mongo_data: Dict) -> 'Profile':
+    def from_mongo_dict(cls, mongo_data: Dict, loader: Optional[BatchLoader] = None) -> 'Profile':
         """
-        Create a UserProfile object from a MongoDB document.
+        Create a UserProfile object from a MongoDB document (short or legacy long keys).
+
+        The document may be projected: fields it lacks are loaded on first
+        access through ``loader``, or raise AttributeError without one.
 
         Args:
             mongo_data (Dict): MongoDB document data.
+            loader (Optional[BatchLoader]): Loader shared by the result set.
         """
-        return cls(
-            uid=mongo_data["_id"],
-            profile_creation_date=datetime.fromisoformat(mongo_data["profile_creation_date"]),
-            profiles_updated_date=datetime.fromisoformat(mongo_data["profiles_updated_date"]),
-            user_name=mongo_data["user_name"],
-            gender=mongo_data.get("gender"),
-            birth_date=datetime.fromisoformat(mongo_data["birth_date"]) if mongo_data.get("birth_date") else None,
-            total_post_created=mongo_data["total_post_created"],
-            total_post_visited=mongo_data["total_post_visited"],
-            wolf_id=mongo_data["wolf_id"],
-            bio=mongo_data["bio"],
-            profile_tag=mongo_data["profile_tag"],
-            profile_level=mongo_data["profile_level"],
-            profile_exp=mongo_data["profile_exp"]
-        )
+        return cls._hydrate(mongo_data, loader)
 
     def validate(self) -> bool:
         """
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Tuple, Union
+
+# Query operators whose value holds field names of the same document.
+_LOGICAL_OPERATORS = ("$and", "$or", "$nor")
+
+
+class FieldMap:
+    """
+    Translation between model attribute names and the short keys stored in MongoDB.
+
+    Field names are repeated in every document, so ``views_count`` costs more
+    bytes than the integer it holds. Models declare a short alias per field;
+    this class rewrites documents, filters, projections, sorts and update
+    operators in both directions. Keys without an alias (``_id``, unknown
+    fields, legacy long keys) pass through unchanged, so documents written
+    before the aliases existed still decode. Queries only match short keys,
+    though: run ``python -m mongodb.migrations`` to rewrite legacy documents.
+    """
+
+    def __init__(self, aliases: Dict[str, str], paths: Dict[str, str] = None):
+        """
+        Args:
+            aliases (Dict[str, str]): Attribute name -> stored key.
+            paths (Dict[str, str]): Extra dotted paths that map to a stored key,
+                e.g. ``{"geolocation.coordinates": "g"}`` when a nested value is
+                flattened on write.
+        """
+        self.aliases = dict(aliases)
+        self.paths = dict(paths or {})
+        self.reverse = {short: name for name, short in self.aliases.items()}
+        if len(self.reverse) != len(self.aliases):
+            raise ValueError("Stored field aliases must be unique")
+
+    def field(self, name: str) -> str:
+        """
+        Stored key for an attribute name or dotted path (``medias.url`` -> ``m.url``).
+        """
+        if name in self.paths:
+            return self.paths[name]
+        head, dot, rest = name.partition(".")
+        return self.aliases.get(head, head) + dot + rest
+
+    def encode(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Rename the top-level keys of a document to their stored aliases."""
+        return {self.aliases.get(key, key): value for key, value in doc.items()}
+
+    def decode(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Rename stored aliases back to attribute names."""
+        return {self.reverse.get(key, key): value for key, value in doc.items()}
+
+    def query(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate the field names of a filter, recursing into ``$and``/``$or``/``$nor``.
+        """
+        translated = {}
+        for key, value in query.items():
+            if key in _LOGICAL_OPERATORS:
+                translated[key] = [self.query(clause) for clause in value]
+            elif key.startswith("$"):
+                translated[key] = value
+            else:
+                translated[self.field(key)] = value
+        return translated
+
+    def projection(self, projection: Union[Dict[str, Any], List[str]]) -> Dict[str, Any]:
+        """Translate a projection given as a mapping or a list of field names."""
+        if isinstance(projection, dict):
+            return {self.field(key): value for key, value in projection.items()}
+        return {self.field(key): 1 for key in projection}
+
+    def sort(self, sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Translate a ``[(field, direction), ...]`` sort specification."""
+        return [(self.field(key), direction) for key, direction in sort]
+
+    def update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate the field names inside update operators (``$set``, ``$inc``, ...).
+        """
+        translated = {}
+        for operator, fields in update.items():
+            if not isinstance(fields, dict):
+                translated[operator] = fields
+            else:
+                translated[operator] = {self.field(key): value for key, value in fields.items()}
+        return translated
@@ -0,0 +1,94 @@
+from typing import Any, Callable, Dict, List, Optional
+
+
+class LazyDocument:
+    """
+    Base for models that can be hydrated from a projected subset of a document.
+
+    Subclasses declare ``FIELDS`` (a ``FieldMap``), ``STORED_CONVERTERS``
+    (attribute name -> function turning the stored value into the attribute
+    value) and ``OPTIONAL_DEFAULTS`` (value used when an optional field is
+    absent and nothing can load it). Fields that were not in the projection are
+    left unset and loaded on first access through the attached ``BatchLoader``.
+    """
+
+    FIELDS = None
+    STORED_CONVERTERS: Dict[str, Callable[[Any], Any]] = {}
+    OPTIONAL_DEFAULTS: Dict[str, Any] = {}
+
+    @classmethod
+    def _hydrate(cls, mongo_data: Dict, loader: Optional['BatchLoader'] = None):
+        """Create an instance from a stored (possibly projected) document."""
+        instance = cls.__new__(cls)
+        instance.uid = mongo_data["_id"]
+        instance._loader = loader
+        instance._load_stored(cls.FIELDS.decode(mongo_data))
+        if loader is not None:
+            loader.register(instance)
+        return instance
+
+    def _load_stored(self, data: Dict) -> None:
+        """Set every attribute present in a decoded document."""
+        for name, convert in self.STORED_CONVERTERS.items():
+            if name in data:
+                setattr(self, name, convert(data[name]))
+
+    def missing_fields(self) -> List[str]:
+        """Model fields that have not been loaded yet."""
+        return [name for name in self.STORED_CONVERTERS if name not in self.__dict__]
+
+    def __getattr__(self, name: str):
+        # Only called when normal lookup fails, i.e. for fields not loaded yet
+        if name.startswith("_") or name not in self.STORED_CONVERTERS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        loader = self.__dict__.get("_loader")
+        if loader is not None:
+            loader.load(name)
+            if name in self.__dict__:
+                return self.__dict__[name]
+        if name in self.OPTIONAL_DEFAULTS:
+            return self.OPTIONAL_DEFAULTS[name]
+        raise AttributeError(f"'{type(self).__name__}' field '{name}' was not loaded")
+
+
+class BatchLoader:
+    """
+    Loads missing fields for every instance of a result set in one query.
+
+    Accessing ``post.title`` on one map pin fetches ``title`` for all pins of
+    the same query that lack it, with a single ``$in`` lookup projected to the
+    requested fields, instead of one round trip per post.
+    """
+
+    def __init__(self, collection, model, prefetch: Optional[List[str]] = None):
+        """
+        Args:
+            collection (pymongo.collection.Collection): Collection the documents came from.
+            model (type): ``LazyDocument`` subclass to fill.
+            prefetch (Optional[List[str]]): Extra fields fetched together with
+                the first missing one (e.g. every card field once any is needed).
+        """
+        self.collection = collection
+        self.model = model
+        self.prefetch = list(prefetch or [])
+        self.instances: Dict[str, LazyDocument] = {}
+
+    def register(self, instance: LazyDocument) -> None:
+        self.instances[instance.uid] = instance
+
+    def load(self, *names: str) -> None:
+        """
+        Fetch ``names`` (plus the prefetch fields) for all registered instances missing them.
+        """
+        names = list(dict.fromkeys(list(names) + self.prefetch))
+        pending = [uid for uid, instance in self.instances.items()
+                   if any(name not in instance.__dict__ for name in names)]
+        if not pending:
+            return
+        projection = self.model.FIELDS.projection(names)
+        for doc in self.collection.find({"_id": {"$in": pending}}, projection):
+            instance = self.instances.get(doc["_id"])
+            if instance is not None:
+                data = self.model.FIELDS.decode(doc)
+                # Never overwrite a value that was already loaded (and possibly modified)
+                instance._load_stored({key: value for key, value in data.items() if key not in instance.__dict__})
@@ -0,0 +1,245 @@
+import base64
+import json
+import math
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE
+
+from mongodb.repository import POSTS_COLLECTION
+from mongodb.schemas.Post import HASHTAG_PATTERN, Post
+from mongodb.schemas.PostBatch import EARTH_RADIUS_M, PostBatch
+from mongodb.schemas.lazy import BatchLoader
+
+F = Post.FIELDS
+
+# Index key patterns created by PostRepository.ensure_indexes, used as hints
+GEO_INDEX = [(F.field("geolocation"), GEOSPHERE), (F.field("created_at"), DESCENDING)]
+HASHTAG_GEO_INDEX = [(F.field("hashtags"), ASCENDING), (F.field("geolocation"), GEOSPHERE)]
+HASHTAG_INDEX = [(F.field("hashtags"), ASCENDING), (F.field("created_at"), DESCENDING)]
+
+WORD_PATTERN = re.compile(r"\w+")
+TITLE_WEIGHT = 3  # Same weighting as the text index
+
+
+def _haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str]]:
+    """
+    Split a search string into lowercase keywords and hashtags.
+
+    Returns:
+        Tuple[List[str], List[str]]: (keywords, hashtags without '#').
+    """
+    hashtags = list(dict.fromkeys(tag.lower() for tag in HASHTAG_PATTERN.findall(query)))
+    keywords = list(dict.fromkeys(word.lower() for word in WORD_PATTERN.findall(HASHTAG_PATTERN.sub(" ", query))))
+    return keywords, hashtags
+
+
+class SearchPage:
+    """One page of search results."""
+
+    def __init__(self, posts: List[Post], next_cursor: Optional[str], plan: Dict):
+        """
+        Args:
+            posts (List[Post]): Ranked posts (card fields loaded, the rest lazily).
+            next_cursor (Optional[str]): Opaque cursor for the next page, None on the last page.
+            plan (Dict): Which predicate drove the query, the selectivity estimates and
+                whether the candidate cap cut off matches (``truncated``).
+        """
+        self.posts = posts
+        self.next_cursor = next_cursor
+        self.plan = plan
+
+
+class PostSearch:
+    """
+    Keyword and hashtag search restricted to a radius or a viewport.
+
+    Three indexes can drive a query: the text index on title/text, the
+    hashtag arrays, and the 2dsphere location index. Each candidate predicate
+    is probed with a capped count, and the query runs on the most selective
+    one. The remaining predicates are applied as filters in the same query;
+    when the text index is not used, keywords become a case-insensitive
+    regex on title/text and are scored in Python. At most ``max_candidates``
+    matches are ranked by ``relevance x distance decay x recency decay``
+    with ``PostBatch`` and paginated with a keyset cursor over
+    ``(score, _id)``; ``plan["truncated"]`` tells when more posts matched.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_candidates: int = 500,
+        probe_limit: int = 1000,
+        recency_half_life_hours: float = 72.0
+    ):
+        """
+        Args:
+            db (pymongo.database.Database): The WolfStep database.
+            max_candidates (int): Maximum documents ranked per search.
+            probe_limit (int): Cap of each selectivity probe (counts stop there).
+            recency_half_life_hours (float): Age at which the recency factor halves.
+        """
+        self.collection = db[POSTS_COLLECTION]
+        self.max_candidates = max_candidates
+        self.probe_limit = probe_limit
+        self.half_life_s = recency_half_life_hours * 3600
+
+    def search(
+        self,
+        query: str,
+        longitude: Optional[float] = None,
+        latitude: Optional[float] = None,
+        radius_m: Optional[float] = None,
+        viewport: Optional[Tuple[float, float, float, float]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> SearchPage:
+        """
+        Search posts in an area.
+
+        Pass either ``longitude``/``latitude``/``radius_m`` or ``viewport``
+        as ``(min_lon, min_lat, max_lon, max_lat)``. Viewports crossing the
+        antimeridian must be split by the caller.
+
+        Args:
+            query (str): Keywords and/or hashtags, e.g. ``"moon #howl"``.
+            longitude (Optional[float]): Center longitude for a radius search.
+            latitude (Optional[float]): Center latitude for a radius search.
+            radius_m (Optional[float]): Radius in meters.
+            viewport (Optional[Tuple]): Bounding box in decimal degrees.
+            limit (int): Page size.
+            cursor (Optional[str]): ``next_cursor`` of the previous page, with the same query and area.
+
+        Raises:
+            ValueError: If the query is empty or the area is missing or ambiguous.
+        """
+        keywords, hashtags = parse_query(query)
+        if not keywords and not hashtags:
+            raise ValueError("Search query must contain a keyword or a hashtag")
+        geo_filter, center, scale = self._area(longitude, latitude, radius_m, viewport)
+        tag_filter = {F.field("hashtags"): {"$all": hashtags}} if hashtags else {}
+        text_filter = {"$text": {"$search": " ".join(keywords)}} if keywords else {}
+
+        estimates = self._estimate(geo_filter, tag_filter, text_filter)
+        driver = min(estimates, key=estimates.get)
+        docs = self._candidates(driver, geo_filter, tag_filter, text_filter, keywords)
+        truncated = len(docs) >= self.max_candidates
+        relevance = self._relevance(driver, docs, keywords)
+        keep = relevance > 0
+        docs = [doc for doc, matched in zip(docs, keep) if matched]
+
+        state = self._decode_cursor(cursor) if cursor else {"now": time.time()}
+        batch = PostBatch.from_documents(docs)
+        scores = self._score(batch, relevance[keep], center, scale, state["now"])
+        ids = np.array([doc["_id"] for doc in batch.docs], dtype=str)
+        order = np.lexsort((ids, -scores)) if len(batch) else np.empty(0, dtype=np.int64)
+        if "score" in state:
+            after = (scores[order] < state["score"]) | ((scores[order] == state["score"]) & (ids[order] > state["id"]))
+            order = order[after]
+
+        page = order[:limit]
+        next_cursor = None
+        if len(order) > limit:
+            last = page[-1]
+            next_cursor = self._encode_cursor({"now": state["now"], "score": float(scores[last]), "id": ids[last]})
+        loader = BatchLoader(self.collection, Post, prefetch=Post.CARD_FIELDS)
+        plan = {"driver": driver, "estimates": estimates, "candidates": len(docs), "truncated": truncated}
+        return SearchPage(batch.select(page).to_posts(loader), next_cursor, plan)
+
+    def _area(self, longitude, latitude, radius_m, viewport):
+        """Geo filter, reference point and distance scale (meters) for the search area."""
+        geo = F.field("geolocation")
+        if viewport is not None and radius_m is None:
+            min_lon, min_lat, max_lon, max_lat = viewport
+            ring = [[min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat], [min_lon, min_lat]]
+            center = ((min_lon + max_lon) / 2, (min_lat + max_lat) / 2)
+            scale = _haversine_m(center[0], center[1], max_lon, max_lat)  # Half diagonal
+            return {geo: {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}}, center, scale
+        if viewport is None and None not in (longitude, latitude, radius_m):
+            sphere = [[longitude, latitude], radius_m / EARTH_RADIUS_M]
+            return {geo: {"$geoWithin": {"$centerSphere": sphere}}}, (longitude, latitude), radius_m
+        raise ValueError("Pass either longitude/latitude/radius_m or viewport")
+
+    def _estimate(self, geo_filter: Dict, tag_filter: Dict, text_filter: Dict) -> Dict[str, int]:
+        """Capped match counts of each predicate on its own index."""
+        estimates = {}
+        if tag_filter:
+            estimates["hashtags"] = self.collection.count_documents(
+                tag_filter, limit=self.probe_limit, hint=HASHTAG_INDEX
+            )
+        if text_filter:
+            estimates["text"] = self.collection.count_documents(text_filter, limit=self.probe_limit)
+        estimates["geo"] = self.collection.count_documents(geo_filter, limit=self.probe_limit, hint=GEO_INDEX)
+        return estimates  # Ties go to the first inserted: hashtags, then text, then geo
+
+    def _candidates(
+        self,
+        driver: str,
+        geo_filter: Dict,
+        tag_filter: Dict,
+        text_filter: Dict,
+        keywords: List[str]
+    ) -> List[Dict]:
+        projection = F.projection(Post.CARD_FIELDS + ["text", "hashtags"])
+        query = {**geo_filter, **tag_filter}
+        if keywords and driver != "text":
+            # Same "any keyword" semantics as $text, filtered by the server so
+            # the candidate cap only counts posts that can match. Substrings
+            # are a superset of the word matches _relevance keeps.
+            pattern = {"$regex": "|".join(re.escape(word) for word in keywords), "$options": "i"}
+            query["$or"] = [{F.field("title"): pattern}, {F.field("text"): pattern}]
+        if driver == "text":
+            projection["score"] = {"$meta": "textScore"}
+            cursor = (
+                self.collection.find({**query, **text_filter}, projection)
+                .sort([("score", {"$meta": "textScore"})])
+            )
+        elif driver == "hashtags":
+            cursor = self.collection.find(query, projection).hint(HASHTAG_GEO_INDEX)
+        else:
+            cursor = self.collection.find(query, projection).hint(GEO_INDEX).sort(F.field("created_at"), DESCENDING)
+        return list(cursor.limit(self.max_candidates))
+
+    def _relevance(self, driver: str, docs: List[Dict], keywords: List[str]) -> np.ndarray:
+        """
+        Text score when the text index ran; otherwise weighted keyword hits
+        (any keyword matches, like ``$text``), or 1 for hashtag-only queries.
+        """
+        if driver == "text":
+            return np.array([doc["score"] for doc in docs], dtype=np.float64)
+        if not keywords:
+            return np.ones(len(docs), dtype=np.float64)
+        terms = set(keywords)
+        title, text = F.field("title"), F.field("text")
+        relevance = np.zeros(len(docs), dtype=np.float64)
+        for i, doc in enumerate(docs):
+            title_hits = sum(1 for word in WORD_PATTERN.findall(doc.get(title, "").lower()) if word in terms)
+            text_hits = sum(1 for word in WORD_PATTERN.findall(doc.get(text, "").lower()) if word in terms)
+            relevance[i] = TITLE_WEIGHT * title_hits + text_hits
+        return relevance
+
+    def _score(self, batch: PostBatch, relevance: np.ndarray, center, scale: float, now: float) -> np.ndarray:
+        distance_decay = 1.0 / (1.0 + batch.distance_to(*center) / max(scale, 1.0))
+        age = np.clip(now - batch.created_at, 0, None)
+        recency_decay = 0.5 ** (age / self.half_life_s)
+        return relevance * distance_decay * recency_decay
+
+    @staticmethod
+    def _encode_cursor(state: Dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict:
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except ValueError:
+            raise ValueError("Invalid search cursor")
@@ -0,0 +1,160 @@
+import gzip
+import json
+from typing import Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from mongodb.repository import PostRepository
+from mongodb.schemas.Post import Post
+from mongodb.visits import VisitTracker
+
+# Number of recently applied counter op ids remembered on each post.
+SYNC_OPS_WINDOW = 64
+
+
+def decode_sync_payload(body: bytes) -> List[Dict]:
+    """
+    Decode a gzip-compressed batch uploaded by the client outbox.
+
+    Args:
+        body (bytes): Raw request body.
+
+    Returns:
+        List[Dict]: The operations in the batch.
+    """
+    return json.loads(gzip.decompress(body).decode("utf-8"))["ops"]
+
+
+def _client_post(op: Dict) -> Optional[Post]:
+    """
+    Rebuild an uploaded post from its client-editable fields, or None if it
+    is malformed or does not match ``op["post_uid"]``. Counters, sync op ids
+    and archive markers always start from the server's defaults.
+    """
+    try:
+        uploaded = Post.from_mongo_dict(op["post"])
+        longitude, latitude = uploaded.geolocation["coordinates"]
+        post = Post(
+            uid=uploaded.uid,
+            parent_uid=uploaded.parent_uid,
+            longitude=float(longitude),
+            latitude=float(latitude),
+            created_at=uploaded.created_at,
+            title=uploaded.title,
+            text=uploaded.text,
+            medias=uploaded.medias
+        )
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    if post.uid != op["post_uid"] or not isinstance(post.title, str) or not isinstance(post.text, str):
+        return None
+    if post.parent_uid is not None and not isinstance(post.parent_uid, str):
+        return None
+    if not isinstance(post.medias, list) or not all(isinstance(media, dict) for media in post.medias):
+        return None
+    return post if post.validate() else None
+
+
+def apply_sync_batch(
+    posts_collection,
+    ops: List[Dict],
+    visits: Optional[VisitTracker] = None,
+    profile_uid: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """
+    Apply a client outbox batch to the posts collection idempotently.
+
+    New posts (in stored form, see ``Post.to_mongo_dict``) are rebuilt from
+    their editable fields with zeroed counters, then upserted with
+    ``$setOnInsert`` keyed by the client-generated uid, so replaying a post
+    never overwrites server-side counters. Malformed posts are rejected. Counter
+    deltas only match a post whose recent ``sync_ops`` do not already contain
+    the op id, and record it in the same atomic update, so a retried batch
+    is not counted twice. They are applied in whichever tier holds the post.
+    Visits go to the visit tracker, whose sketches
+    ignore repeats, and are flushed before the batch is acknowledged; they
+    are dropped if no tracker or profile is given. An error while writing
+    propagates, so the client keeps the batch and retries it.
+
+    Args:
+        posts_collection (pymongo.collection.Collection): Target collection.
+        ops (List[Dict]): Operations as produced by ``Outbox.take_batch``.
+        visits (Optional[VisitTracker]): Tracker receiving ``visit`` operations.
+        profile_uid (Optional[str]): Authenticated profile that uploaded the batch.
+
+    Returns:
+        Dict[str, List[str]]: ``acked`` op ids were applied; ``rejected`` ones
+        never will be (malformed post, counters for an unknown post). The
+        client drops both. Ops in neither list must be retried.
+    """
+    rejected = []
+    creates = []
+    for op in ops:
+        if op["kind"] != "post":
+            continue
+        post = _client_post(op)
+        if post is None:
+            rejected.append(op["op_id"])
+        else:
+            creates.append(UpdateOne({"_id": post.uid}, {"$setOnInsert": post.to_mongo_dict()}, upsert=True))
+    if creates:
+        # Before counters, which may target a post created in the same batch
+        posts_collection.bulk_write(creates, ordered=False)
+
+    counters = [op for op in ops if op["kind"] == "counters"]
+    locations = PostRepository(posts_collection.database).locate(op["post_uid"] for op in counters)
+    by_collection: Dict[str, Tuple] = {}
+    for op in counters:
+        collection = locations.get(op["post_uid"])
+        if collection is None:
+            rejected.append(op["op_id"])
+            continue
+        query = {"_id": op["post_uid"], "sync_ops": {"$ne": op["op_id"]}}
+        _, requests = by_collection.setdefault(collection.name, (collection, []))
+        requests.append(UpdateOne(
+            Post.FIELDS.query(query),
+            Post.FIELDS.update({
+                "$inc": {"like_count": op["like_delta"], "view_events": op["view_delta"]},
+                "$push": {"sync_ops": {"$each": [op["op_id"]], "$slice": -SYNC_OPS_WINDOW}}
+            })
+        ))
+    for collection, requests in by_collection.values():
+        collection.bulk_write(requests, ordered=False)
+    applied = _applied_counter_ops(posts_collection, counters)
+
+    recorded = False
+    for op in ops:
+        if op["kind"] == "visit" and visits is not None and profile_uid is not None:
+            visits.record_visit(profile_uid, op["post_uid"])
+            recorded = True
+    if recorded:
+        # Persist before acking: the client deletes acked visits, and the
+        # tracker's buffer would die with this process
+        visits.flush()
+    refused = set(rejected)
+    acked = [
+        op["op_id"] for op in ops
+        if op["op_id"] not in refused and (op["kind"] != "counters" or op["op_id"] in applied)
+    ]
+    return {"acked": acked, "rejected": rejected}
+
+
+def _applied_counter_ops(posts_collection, counters: List[Dict]) -> Set[str]:
+    """
+    Counter op ids recorded in ``sync_ops`` of the post they target, in
+    whichever tier holds it now. Ops lost to a post being archived
+    mid-update are missing and must be retried.
+    """
+    if not counters:
+        return set()
+    op_ids = [op["op_id"] for op in counters]
+    locations = PostRepository(posts_collection.database).locate(op["post_uid"] for op in counters)
+    by_collection: Dict[str, Tuple] = {}
+    for uid, collection in locations.items():
+        by_collection.setdefault(collection.name, (collection, []))[1].append(uid)
+    applied = set()
+    sync_ops = Post.FIELDS.field("sync_ops")
+    for collection, uids in by_collection.values():
+        for doc in collection.find({"_id": {"$in": uids}, sync_ops: {"$in": op_ids}}, {sync_ops: 1}):
+            applied.update(doc[sync_ops])
+    return applied.intersection(op_ids)
@@ -0,0 +1,239 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, DeleteOne, ReplaceOne, UpdateOne
+
+from common.log import get_logger
+from mongodb.schemas.Post import Post
+
+log = get_logger("tiering")
+
+ARCHIVE_PREFIX = "posts_archive_"
+STATE_COLLECTION = "tiering_state"
+# Uid -> archive bucket of every archived post, plus parent and creation time
+# so thread lookups can find archived replies without touching the hot tier.
+LOCATOR_COLLECTION = "post_locations"
+STATE_ID = "posts"
+STATE_TTL = 60.0  # Seconds readers may keep using a cached horizon
+
+F = Post.FIELDS
+# Stored fields updated in place on live posts (counters and sync op ids)
+MUTABLE_KEYS = [F.field(name) for name in ("views_count", "view_events", "like_count", "reply_count", "sync_ops")]
+
+
+def archive_bucket(created_at: str) -> str:
+    """
+    Archive collection for a stored ``created_at`` ISO string: one per month,
+    e.g. ``posts_archive_2025_02``.
+    """
+    return f"{ARCHIVE_PREFIX}{created_at[:4]}_{created_at[5:7]}"
+
+
+def buckets_between(start: Optional[str], end: str, known: List[str]) -> List[str]:
+    """
+    Known archive buckets that may hold posts created in ``[start, end)``.
+
+    Args:
+        start (Optional[str]): ISO lower bound, or None for the beginning of time.
+        end (str): ISO upper bound.
+        known (List[str]): Buckets that exist.
+    """
+    first = archive_bucket(start) if start else ""
+    last = archive_bucket(end)
+    return sorted(bucket for bucket in known if first <= bucket <= last)
+
+
+class TieringState:
+    """
+    Cached view of the ``tiering_state`` document.
+
+    ``horizon`` is the ``created_at`` before which posts may have moved to an
+    archive bucket. It is raised *before* any post is moved, so a reader using
+    it never misses a post that is in flight.
+    """
+
+    def __init__(self, db, ttl: float = STATE_TTL):
+        """
+        Args:
+            db (pymongo.database.Database): The WolfStep database.
+            ttl (float): Seconds a read of the state document is reused.
+        """
+        self.collection = db[STATE_COLLECTION]
+        self.ttl = ttl
+        self._doc: Dict = {}
+        self._loaded_at = 0.0
+
+    def _state(self) -> Dict:
+        if time.monotonic() - self._loaded_at > self.ttl:
+            self._doc = self.collection.find_one({"_id": STATE_ID}) or {}
+            self._loaded_at = time.monotonic()
+        return self._doc
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+    @property
+    def horizon(self) -> Optional[str]:
+        return self._state().get("horizon")
+
+    @property
+    def buckets(self) -> List[str]:
+        return self._state().get("buckets", [])
+
+    def needs_archive(self, since: Optional[str]) -> bool:
+        """True if a query reaching back to ``since`` (None = hot tier only) must read archives."""
+        return since is not None and self.horizon is not None and since < self.horizon
+
+
+class PostTiering:
+    """
+    Moves old posts from the hot ``posts`` collection into monthly archive collections.
+
+    Each batch is first upserted into its archive bucket and recorded in the
+    ``post_locations`` locator ``{_id, archive_bucket, created_at[, parent_uid]}``,
+    then deleted from the hot collection, which keeps its size and indexes
+    flat over time. Id lookups, counter updates and thread lookups that miss
+    the hot tier go through the locator. The delete only applies if the
+    post's counters still match the copy; posts updated in between are copied
+    again. Every step is idempotent and the job picks up whatever is still
+    left in the hot collection, so an interrupted run is resumed by simply
+    running it again.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_age: timedelta = timedelta(days=30),
+        batch_size: int = 500,
+        settle_seconds: float = STATE_TTL
+    ):
+        """
+        Args:
+            db (pymongo.database.Database): The WolfStep database.
+            max_age (timedelta): Posts older than this are archived.
+            batch_size (int): Posts moved per batch.
+            settle_seconds (float): Wait after raising the horizon so readers'
+                cached state expires before posts start moving.
+        """
+        self.db = db
+        self.hot = db["posts"]
+        self.state = db[STATE_COLLECTION]
+        self.locator = db[LOCATOR_COLLECTION]
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+        self._indexed = set()
+
+    def _ensure_bucket(self, name: str) -> None:
+        if name in self._indexed:
+            return
+        bucket = self.db[name]
+        bucket.create_index([(F.field("geolocation"), GEOSPHERE), (F.field("created_at"), DESCENDING)])
+        bucket.create_index([(F.field("parent_uid"), ASCENDING), (F.field("created_at"), ASCENDING)])
+        self.state.update_one({"_id": STATE_ID}, {"$addToSet": {"buckets": name}}, upsert=True)
+        self._indexed.add(name)
+
+    def _ensure_locator(self) -> None:
+        if LOCATOR_COLLECTION in self._indexed:
+            return
+        parent = F.field("parent_uid")
+        self.locator.create_index(
+            [(parent, ASCENDING), (F.field("created_at"), ASCENDING)],
+            partialFilterExpression={parent: {"$type": "string"}}  # Replies only
+        )
+        self._indexed.add(LOCATOR_COLLECTION)
+
+    def run(self, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> Dict:
+        """
+        Archive every hot post created before ``now - max_age``.
+
+        Args:
+            now (Optional[datetime]): Reference time (defaults to utcnow).
+            max_batches (Optional[int]): Stop after this many batches (resume later).
+
+        Returns:
+            Dict: Counts of archived posts and batches.
+        """
+        cutoff = ((now if now else datetime.utcnow()) - self.max_age).isoformat()
+        # Raise the horizon first so readers fan out before any post moves
+        previous = (self.state.find_one({"_id": STATE_ID}) or {}).get("horizon")
+        if previous is None or previous < cutoff:
+            self.state.update_one({"_id": STATE_ID}, {"$max": {"horizon": cutoff}}, upsert=True)
+            time.sleep(self.settle_seconds)
+
+        self._ensure_locator()
+        created = F.field("created_at")
+        query = {created: {"$lt": cutoff}}
+        stats = {"archived": 0, "batches": 0}
+        while max_batches is None or stats["batches"] < max_batches:
+            docs = list(self.hot.find(query).sort([(created, ASCENDING), ("_id", ASCENDING)]).limit(self.batch_size))
+            if not docs:
+                break
+            self._move(docs, stats)
+            stats["batches"] += 1
+
+        self.state.update_one(
+            {"_id": STATE_ID},
+            {"$set": {"last_run": datetime.utcnow().isoformat(), "last_stats": stats}},
+            upsert=True
+        )
+        log.info("Post tiering (cutoff %s): %s", cutoff, stats)
+        return stats
+
+    def _copy(self, docs: List[Dict]) -> None:
+        """Upsert posts into their archive buckets and record them in the locator."""
+        created, parent, archived_key = F.field("created_at"), F.field("parent_uid"), F.field("archive_bucket")
+        by_bucket: Dict[str, List] = {}
+        for doc in docs:
+            by_bucket.setdefault(archive_bucket(doc[created]), []).append(doc)
+        for name, bucket_docs in by_bucket.items():
+            self._ensure_bucket(name)
+            self.db[name].bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in bucket_docs], ordered=False
+            )
+
+        locations = []
+        for doc in docs:
+            location = {created: doc[created], archived_key: archive_bucket(doc[created])}
+            if doc.get(parent) is not None:
+                location[parent] = doc[parent]
+            locations.append(UpdateOne({"_id": doc["_id"]}, {"$set": location}, upsert=True))
+        self.locator.bulk_write(locations, ordered=False)
+
+    def _move(self, docs: List[Dict], stats: Dict, attempts: int = 3) -> None:
+        self._copy(docs)
+
+        # Only delete hot documents whose counters still match the copy: a like,
+        # view or sync that landed in between would otherwise be lost.
+        hot_requests = []
+        for doc in docs:
+            unchanged = {"_id": doc["_id"]}
+            unchanged.update({key: doc.get(key) for key in MUTABLE_KEYS})
+            hot_requests.append(DeleteOne(unchanged))
+        self.hot.bulk_write(hot_requests, ordered=False)
+
+        # Documents that changed after the copy are still in the hot tier: copy them again
+        changed = list(self.hot.find({"_id": {"$in": [doc["_id"] for doc in docs]}}))
+        stats["archived"] += len(docs) - len(changed)
+        if changed and attempts > 1:
+            self._move(changed, stats, attempts - 1)
+
+
+# Example usage: python -m mongodb.tiering --max-age-days 30
+if __name__ == "__main__":
+    import argparse
+    from common.log import configure_logging
+    from mongodb.mongodb import MongoDBConnector
+
+    parser = argparse.ArgumentParser(description="Move old posts to monthly archive collections")
+    parser.add_argument("--max-age-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    configure_logging()
+
+    with MongoDBConnector() as connector:
+        PostTiering(connector.get_database(), timedelta(days=args.max_age_days), args.batch_size).run(
+            max_batches=args.max_batches
+        )
@@ -0,0 +1,12 @@
+import pytest
+
+from mongodb.loadtest.driver import percentile
+
+
+@pytest.mark.parametrize("q, expected", [(0, 1), (20, 1), (50, 3), (60, 3), (61, 4), (99, 5), (100, 5)])
+def test_percentile_is_nearest_rank(q, expected):
+    assert percentile([1, 2, 3, 4, 5], q) == expected
+
+
+def test_percentile_of_empty_list():
+    assert percentile([], 99) == 0.0
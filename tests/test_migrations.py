@@ -0,0 +1,63 @@
+import mongomock
+import pytest
+
+from mongodb.migrations import (
+    POST_CONVERTERS, POST_COUNTERS, POST_RENAMES, backfill_hashtags, legacy_collections, migrate_all, migrate_short_keys
+)
+from mongodb.repository import PostRepository
+from mongodb.schemas.Post import Post
+
+
+def legacy_post(uid, likes=2):
+    return {
+        "_id": uid,
+        "geolocation": {"type": "Point", "coordinates": [2.35, 48.85]},
+        "created_at": "2025-01-02T03:04:05",
+        "title": "Old",
+        "text": "Before short keys #wolf",
+        "medias": [],
+        "views_count": 5,
+        "like_count": likes,
+        "reply_count": 0
+    }
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().wolfstep
+    db.posts.insert_many([legacy_post(f"post-{i:02}") for i in range(7)])
+    db.profiles.insert_one({"_id": "user-0", "user_name": "wolf", "total_post_visited": 4})
+    return db
+
+
+def test_migrates_to_short_keys(db):
+    assert legacy_collections(db) == ["profiles", "posts"]
+    PostRepository(db).like("post-00")  # Written with short keys before the migration ran
+    PostRepository(db).add_view("post-00")
+    migrate_all(db, batch_size=3)
+
+    doc = db.posts.find_one({"_id": "post-00"})
+    assert doc["g"] == [2.35, 48.85]
+    assert doc["lc"] == 3
+    assert (doc["ve"], doc["vc"]) == (6, 0)  # Legacy raw views are not unique viewers
+    assert "geolocation" not in doc and "like_count" not in doc
+    assert PostRepository(db).get("post-03").title == "Old"
+    assert db.profiles.find_one({"_id": "user-0"})["tpv"] == 4
+    assert legacy_collections(db) == []
+
+
+def test_resume_does_not_double_count(db):
+    def migrate(**kwargs):
+        return migrate_short_keys(db.posts, Post.FIELDS, POST_CONVERTERS, POST_COUNTERS, renames=POST_RENAMES, **kwargs)
+
+    assert migrate(batch_size=2, max_batches=2) == {"migrated": 4, "batches": 2}
+    assert migrate(batch_size=2)["migrated"] == 3
+    assert [(doc["lc"], doc["ve"]) for doc in db.posts.find()] == [(2, 5)] * 7
+
+
+def test_backfills_hashtags_once(db):
+    PostRepository(db).create(Post(uid="post-new", text="Fresh #Howl"))
+    migrate_all(db)
+    assert db.posts.find_one({"_id": "post-03"})["ht"] == ["wolf"]
+    assert db.posts.find_one({"_id": "post-new"})["ht"] == ["howl"]
+    assert backfill_hashtags(db.posts)["updated"] == 0
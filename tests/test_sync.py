@@ -0,0 +1,58 @@
+import mongomock
+import pytest
+
+from mongodb.repository import PostRepository
+from mongodb.schemas.Post import Post
+from mongodb.sync import apply_sync_batch
+
+
+def counters(op_id, post_uid, likes=1):
+    return {"op_id": op_id, "kind": "counters", "post_uid": post_uid, "like_delta": likes, "view_delta": 0}
+
+
+def upload(op_id, stored):
+    return {"op_id": op_id, "kind": "post", "post_uid": stored["_id"], "post": stored}
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().wolfstep
+    PostRepository(db).create(Post(uid="post-1"))
+    return db
+
+
+def test_acks_applied_and_rejects_unknown_posts(db):
+    ops = [
+        counters("op-1", "post-1", likes=2),
+        counters("op-2", "missing"),
+        upload("op-3", Post(uid="post-2").to_mongo_dict()),
+        counters("op-4", "post-2")
+    ]
+    expected = {"acked": ["op-1", "op-3", "op-4"], "rejected": ["op-2"]}
+    assert apply_sync_batch(db.posts, ops) == expected
+    assert apply_sync_batch(db.posts, ops) == expected  # Retried batch
+    assert db.posts.find_one({"_id": "post-1"})["lc"] == 2
+
+
+def test_uploaded_post_cannot_set_server_fields(db):
+    db.profiles.insert_one({"_id": "user-0"})
+    forged = {**Post(uid="post-2", title="Hi").to_mongo_dict(), "ab": "profiles", "vc": 10**9, "lc": 7, "so": ["op-9"]}
+    reply = apply_sync_batch(db.posts, [upload("op-1", forged), counters("op-2", "post-2")])
+    assert reply == {"acked": ["op-1", "op-2"], "rejected": []}
+
+    doc = db.posts.find_one({"_id": "post-2"})
+    assert (doc["t"], doc["vc"], doc["lc"], doc["so"]) == ("Hi", 0, 1, ["op-2"])
+    assert "ab" not in doc
+    assert db.profiles.find_one({"_id": "user-0"}) == {"_id": "user-0"}
+
+
+@pytest.mark.parametrize("stored", [
+    {**Post(uid="post-3").to_mongo_dict(), "_id": "someone-else"},
+    {**Post(uid="post-3").to_mongo_dict(), "g": ["east", "north"]},
+    {**Post(uid="post-3").to_mongo_dict(), "m": [{"type": "exe", "url": "x"}]},
+    {"_id": "post-3"}
+])
+def test_rejects_malformed_posts(db, stored):
+    op = {"op_id": "op-1", "kind": "post", "post_uid": "post-3", "post": stored}
+    assert apply_sync_batch(db.posts, [op]) == {"acked": [], "rejected": ["op-1"]}
+    assert db.posts.find_one({"_id": "post-3"}) is None
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from mongodb.repository import PostRepository
+from mongodb.schemas.Post import Post
+from mongodb.sync import apply_sync_batch
+from mongodb.tiering import LOCATOR_COLLECTION, PostTiering, TieringState, buckets_between
+
+NOW = datetime(2025, 3, 15)
+OLD, RECENT = datetime(2025, 1, 10), datetime(2025, 3, 10)
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().wolfstep
+    PostRepository(db).insert_many([
+        Post(uid="root", created_at=OLD, title="Howl", like_count=4),
+        Post(uid="reply-old", parent_uid="root", created_at=OLD + timedelta(hours=1)),
+        Post(uid="reply-new", parent_uid="root", created_at=RECENT),
+        Post(uid="fresh", created_at=RECENT)
+    ])
+    return db
+
+
+def archive(db, tiering=None):
+    return (tiering or PostTiering(db, timedelta(days=30), settle_seconds=0)).run(now=NOW)
+
+
+def test_archived_posts_leave_the_hot_tier(db):
+    assert archive(db) == {"archived": 2, "batches": 1}
+    assert sorted(doc["_id"] for doc in db.posts.find()) == ["fresh", "reply-new"]
+    assert db.posts_archive_2025_01.count_documents({}) == 2
+    assert db[LOCATOR_COLLECTION].find_one({"_id": "reply-old"}) == {
+        "_id": "reply-old", "c": (OLD + timedelta(hours=1)).isoformat(), "ab": "posts_archive_2025_01", "p": "root"
+    }
+    assert archive(db)["archived"] == 0  # Nothing left to move
+
+
+def test_lookups_and_updates_follow_the_locator(db):
+    archive(db)
+    repo = PostRepository(db)
+    assert repo.get("root").title == "Howl"
+    assert repo.get("root", fields=Post.PIN_FIELDS).title == "Howl"  # Lazily loaded from the bucket
+    assert [post.uid for post in repo.thread("root")] == ["reply-old", "reply-new"]
+    assert [post.uid for post in repo.thread("root", limit=1)] == ["reply-old"]
+
+    repo.like("root")
+    assert db.posts_archive_2025_01.find_one({"_id": "root"})["lc"] == 5
+    assert db.posts.find_one({"_id": "root"}) is None
+
+    op = {"op_id": "op-1", "kind": "counters", "post_uid": "root", "like_delta": 2, "view_delta": 0}
+    assert apply_sync_batch(db.posts, [op]) == {"acked": ["op-1"], "rejected": []}
+    assert db.posts_archive_2025_01.find_one({"_id": "root"})["lc"] == 7
+
+
+def test_counter_write_during_move_is_kept(db):
+    tiering = PostTiering(db, timedelta(days=30), settle_seconds=0)
+    copy, copies = tiering._copy, []
+
+    def copy_then_like(docs):
+        copy(docs)
+        copies.append([doc["_id"] for doc in docs])
+        if len(copies) == 1:
+            PostRepository(db).like("root")  # Lands between the copy and the delete
+
+    tiering._copy = copy_then_like
+    assert archive(db, tiering)["archived"] == 2
+    assert copies == [["root", "reply-old"], ["root"]]
+    assert db.posts.find_one({"_id": "root"}) is None
+    assert db.posts_archive_2025_01.find_one({"_id": "root"})["lc"] == 5
+
+
+def test_archive_fan_out_bounds():
+    known = ["posts_archive_2024_12", "posts_archive_2025_01", "posts_archive_2025_02"]
+    assert buckets_between("2025-01-20T00:00:00", "2025-02-01T00:00:00", known) == known[1:]
+    assert buckets_between(None, "2025-01-01T00:00:00", known) == known[:2]
+
+
+def test_needs_archive_only_past_the_horizon(db):
+    state = TieringState(db, ttl=0)
+    assert not state.needs_archive("2024-01-01T00:00:00")  # Nothing archived yet
+    archive(db)
+    assert state.needs_archive("2025-01-01T00:00:00")
+    assert not state.needs_archive("2025-03-01T00:00:00")
+    assert not state.needs_archive(None)
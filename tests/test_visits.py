@@ -0,0 +1,139 @@
+import threading
+
+import mongomock
+import pytest
+
+from mongodb.repository import PostRepository
+from mongodb.schemas.Post import Post
+from mongodb.visits import SKETCH_COLLECTION, BloomFilter, HyperLogLog, VisitTracker
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().wolfstep
+    PostRepository(db).insert_many([Post(uid=f"post-{i}", views_count=50) for i in range(3)])
+    db.profiles.insert_many([{"_id": f"user-{i}", "tpv": 0} for i in range(20)])
+    return db
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(capacity=500, error_rate=0.01)
+    members = [f"post-{i}" for i in range(500)]
+    assert bloom.add(members[0])
+    for member in members:
+        bloom.add(member)
+    assert all(member in bloom for member in members)
+    assert not bloom.add(members[0])
+
+
+def test_bloom_false_positive_rate_at_capacity():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"post-{i}")
+    measured = sum(1 for i in range(50_000) if f"other-{i}" in bloom) / 50_000
+    assert measured <= 0.015
+    assert bloom.false_positive_rate() == pytest.approx(measured, abs=0.005)
+
+
+def test_bloom_document_round_trip_and_merge():
+    first, second = BloomFilter(capacity=100), BloomFilter(capacity=100)
+    first.add("a")
+    second.add("b")
+    restored = BloomFilter.from_document(first.to_document())
+    restored.merge(second)
+    assert "a" in restored and "b" in restored
+    with pytest.raises(ValueError):
+        restored.merge(BloomFilter(capacity=10))
+
+
+@pytest.mark.parametrize("cardinality", [10, 1_000, 100_000])
+def test_hll_error_within_three_standard_errors(cardinality):
+    hll = HyperLogLog(precision=12)
+    for i in range(cardinality):
+        hll.add(f"profile-{i}")
+    error = abs(hll.count() - cardinality) / cardinality
+    assert error <= 3 * hll.standard_error()
+
+
+def test_hll_merge_is_union():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        (left if i % 2 else right).add(f"profile-{i}")
+        both.add(f"profile-{i}")
+    left.merge(right)
+    assert left.registers == both.registers
+    assert HyperLogLog.from_document(left.to_document()).count() == both.count()
+
+
+def test_flush_counts_unique_visits(db):
+    tracker = VisitTracker(db)
+    for user in range(20):
+        for post in range(3):
+            tracker.record_visit(f"user-{user}", f"post-{post}")
+    assert tracker.flush()["new_visits"] == 60
+    for user in range(20):
+        tracker.record_visit(f"user-{user}", "post-0")  # Revisits
+    assert tracker.flush()["new_visits"] == 0
+
+    assert db.posts.find_one({"_id": "post-0"})["vc"] == 20
+    assert db.profiles.find_one({"_id": "user-3"})["tpv"] == 3
+
+
+def test_raw_views_do_not_touch_unique_count(db):
+    tracker = VisitTracker(db)
+    tracker.record_visit("user-0", "post-0")
+    tracker.flush()
+    for _ in range(3):
+        PostRepository(db).add_view("post-0")
+    doc = db.posts.find_one({"_id": "post-0"})
+    assert (doc["vc"], doc["ve"]) == (1, 3)
+
+
+def test_save_detects_concurrent_flush(db):
+    tracker, other = VisitTracker(db), VisitTracker(db)
+    tracker.record_visit("user-0", "post-0")
+    tracker.flush()
+    stale = db[SKETCH_COLLECTION].find_one({"_id": "post:post-0"})
+
+    other.record_visit("user-1", "post-0")
+    other.flush()
+    assert not tracker._save("post:post-0", stale, HyperLogLog().to_document())
+
+    tracker.record_visit("user-2", "post-0")
+    tracker.flush()  # Re-reads and merges on top of the other flush
+    assert db.posts.find_one({"_id": "post-0"})["vc"] == 3
+
+
+def test_failed_flush_requeues_visits(db, monkeypatch):
+    tracker = VisitTracker(db)
+    tracker.record_visit("user-0", "post-0")
+    tracker.record_visit("user-0", "post-1")
+
+    def fail(uid, update):
+        raise ConnectionError("network down")
+
+    monkeypatch.setattr(tracker.posts, "update", fail)
+    with pytest.raises(ConnectionError):
+        tracker.flush()
+    monkeypatch.undo()
+
+    tracker.flush()
+    assert db.profiles.find_one({"_id": "user-0"})["tpv"] == 2
+    assert db.posts.find_one({"_id": "post-1"})["vc"] == 1
+
+
+def test_periodic_flush_survives_errors(db, monkeypatch):
+    tracker = VisitTracker(db)
+    calls = []
+    done = threading.Event()
+
+    def flaky_flush():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("network down")
+        done.set()
+
+    monkeypatch.setattr(tracker, "flush", flaky_flush)
+    stop = tracker.run_periodic(interval=0.01)
+    assert done.wait(2)
+    stop.set()